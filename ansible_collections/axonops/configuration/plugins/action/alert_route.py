@@ -0,0 +1,6 @@
+from ansible_collections.axonops.configuration.plugins.modules import alert_route
+from ansible_collections.axonops.configuration.plugins.plugin_utils.axonops_action import AxonOpsActionBase
+
+
+class ActionModule(AxonOpsActionBase):
+    module = alert_route
@@ -0,0 +1,9 @@
+from ansible_collections.axonops.configuration.plugins.modules import get_clusters
+from ansible_collections.axonops.configuration.plugins.plugin_utils.axonops_action import AxonOpsActionBase
+
+
+class ActionModule(AxonOpsActionBase):
+    module = get_clusters
+
+    # the clusters of the org are listed once
+    fan_out = False
@@ -0,0 +1,40 @@
+from ansible.errors import AnsibleFilterError
+
+# the options of a config item that select the AxonOps client rather than describe the item
+DEFAULT_CLIENT_KEYS = ('cluster_type', 'auth_token', 'username', 'password')
+
+
+def group_by_client(items, name='items', client_keys=DEFAULT_CLIENT_KEYS):
+    """
+    Group the config items by the cluster type and the credentials they set, so a module is called once per
+    AxonOps client. `items` is a list, the groups have it under `name`, or a dict of lists, the groups have
+    every list by its key. The groups are in the order their client is first seen.
+    """
+    if isinstance(items, dict):
+        lists = items
+    elif isinstance(items, (list, tuple)):
+        lists = {name: items}
+    else:
+        raise AnsibleFilterError(f'group_by_client expects a list or a dict of lists, got {type(items).__name__}')
+
+    groups = {}
+    for list_name, list_items in lists.items():
+        for item in list_items or []:
+            if not isinstance(item, dict):
+                raise AnsibleFilterError(f'group_by_client expects dicts in {list_name}, got {type(item).__name__}')
+            client = {key: value for key, value in item.items() if key in client_keys and value is not None}
+            options = {key: value for key, value in item.items() if key not in client_keys}
+
+            group_key = tuple(sorted((key, str(value)) for key, value in client.items()))
+            if group_key not in groups:
+                groups[group_key] = {'client': client, **{key: [] for key in lists}}
+            groups[group_key][list_name].append(options)
+    return list(groups.values())
+
+
+class FilterModule:
+
+    def filters(self):
+        return {
+            'group_by_client': group_by_client,
+        }
@@ -0,0 +1,153 @@
+DOCUMENTATION = r'''
+---
+name: clusters
+
+short_description: List the clusters of the AxonOps organisation.
+
+version_added: "1.0.0"
+
+description:
+    - Return the names of the clusters of the organisation, sorted by name for each cluster type,
+      like the clusters returned by axonops.configuration.get_clusters.
+    - The clusters are cached on the controller in AXONOPS_CACHE_DIR, per URL, organisation and credential,
+      so AxonOps is asked once per C(ttl) seconds by all the playbooks.
+    - The terms are shell-style patterns, a cluster is returned when its name matches one of them.
+      Without terms every cluster is returned.
+    - The connection options are the ones of the modules, read from the same environment variables.
+
+options:
+    _terms:
+        description:
+            - Patterns of the cluster names, e.g. C(prod-*).
+        required: false
+    cluster_type:
+        description:
+            - Only return the clusters of this type, e.g. C(cassandra) or C(kafka).
+            - The clusters of every type are returned when it is not set.
+        required: false
+        type: str
+    ttl:
+        description:
+            - Seconds the cached clusters are used without asking AxonOps, C(0) disables the cache.
+            - It can be read from the environment variable AXONOPS_CLUSTERS_TTL.
+        required: false
+        type: float
+        default: 300
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    base_url:
+        description:
+            - This represent the base url.
+            - It can be read from the environment variable AXONOPS_URL.
+        required: false
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server.
+            - It can be read from the environment variable AXONOPS_API_TOKEN.
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+'''
+
+EXAMPLES = r'''
+- name: Apply the tasks to every cluster of the org
+  ansible.builtin.include_tasks: tasks/backups.yml
+  vars:
+    cluster: "{{ item }}"
+  loop: "{{ query('axonops.configuration.clusters', org=org) }}"
+
+- name: Apply the tasks to the production Cassandra clusters
+  ansible.builtin.include_tasks: tasks/backups.yml
+  vars:
+    cluster: "{{ item }}"
+  loop: "{{ query('axonops.configuration.clusters', 'prod-*', org=org, cluster_type='cassandra') }}"
+'''
+
+RETURN = r'''
+_list:
+    description: The names of the clusters, the cluster types in the order of AxonOps and the names sorted.
+    type: list
+    elements: str
+'''
+
+from fnmatch import fnmatchcase
+
+from ansible.errors import AnsibleLookupError
+from ansible.module_utils.basic import env_fallback
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.plugins.lookup import LookupBase
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_cache import \
+    DEFAULT_CLUSTERS_CACHE_TTL, ClustersCache
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+from ansible_collections.axonops.configuration.plugins.plugin_utils.axonops_action import get_client
+
+
+def lookup_args() -> dict:
+    module_args = make_module_args({
+        'ttl': {'type': 'float', 'required': False, 'fallback': (env_fallback, ['AXONOPS_CLUSTERS_TTL']),
+                'default': DEFAULT_CLUSTERS_CACHE_TTL},
+    })
+    # a filter here, the clusters of every type are listed when it is not given
+    module_args['cluster_type'] = {'type': 'str', 'required': False}
+    return module_args
+
+
+def filter_clusters(clusters: dict, cluster_type: str | None, patterns: list) -> list:
+    """
+    the names of the clusters of the type, or of every type, that match one of the patterns
+    """
+    names = []
+    for current_type, type_names in clusters.items():
+        if cluster_type and current_type != cluster_type:
+            continue
+        names.extend(name for name in type_names
+                     if not patterns or any(fnmatchcase(name, pattern) for pattern in patterns))
+    return names
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        validation = ArgumentSpecValidator(lookup_args()).validate(kwargs)
+        if validation.error_messages:
+            raise AnsibleLookupError(validation.errors.msg)
+        params = validation.validated_parameters
+
+        identity = params['username'] or params['api_token'] or params['auth_token'] or ''
+        clusters_cache = ClustersCache(params['base_url'], params['org'], identity, ttl=params['ttl'])
+
+        clusters = clusters_cache.get()
+        if clusters is None:
+            axonops = get_client({**params, 'cluster_type': params['cluster_type'] or 'cassandra'})
+            if axonops.errors:
+                raise AnsibleLookupError(' '.join(axonops.errors))
+
+            clusters, error = axonops.get_clusters()
+            if error is not None:
+                raise AnsibleLookupError(error)
+            clusters_cache.store(clusters)
+
+        return filter_clusters(clusters, params['cluster_type'], [str(term) for term in terms])
@@ -1,14 +1,61 @@
 import json
+import threading
+import time
+import urllib.error
 import urllib.parse
 from ansible.module_utils.urls import open_url
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_cache import DEFAULT_RESPONSE_CACHE_TTL, \
+    ResponseCache, SnapshotStore, TokenCache
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_http import \
+    DEFAULT_CIRCUIT_BREAKER_RESET, DEFAULT_CIRCUIT_BREAKER_THRESHOLD, DEFAULT_POOL_IDLE_TIMEOUT, DEFAULT_POOL_SIZE, \
+    DEFAULT_RETRY_BASE_DELAY, DEFAULT_RETRY_MAX_ATTEMPTS, RETRY_ERRORS, RETRY_STATUSES, CircuitBreaker, RateLimiter, \
+    RetryPolicy, get_connection_pool, is_connection_failure, uses_proxy
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_integration_registry import \
+    IntegrationRegistry
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_nodes import DEFAULT_NODE_INDEX_TTL, \
+    NodeIndex
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_stats import RequestStats, \
+    endpoint_template
+
+
+# independent GETs sent at the same time by do_requests, it matches the default pool size
+DEFAULT_GATHER_WORKERS = 4
+
+
+def make_axonops(params: dict) -> 'AxonOps':
+    """
+    Create the AxonOps client from the module parameters
+    """
+    return AxonOps(params['org'], auth_token=params['auth_token'], base_url=params['base_url'],
+                   username=params['username'], password=params['password'],
+                   cluster_type=params['cluster_type'], api_token=params['api_token'],
+                   override_saas=params['override_saas'], pool_size=params['pool_size'],
+                   pool_idle_timeout=params['pool_idle_timeout'], token_cache=params['token_cache'],
+                   response_cache=params['response_cache'], response_cache_ttl=params['response_cache_ttl'],
+                   retry_max_attempts=params['retry_max_attempts'], retry_base_delay=params['retry_base_delay'],
+                   retry_jitter=params['retry_jitter'], rate_limit=params['rate_limit'],
+                   rate_limit_burst=params['rate_limit_burst'], stats_debug=params['stats_debug'],
+                   circuit_breaker_threshold=params['circuit_breaker_threshold'],
+                   circuit_breaker_reset=params['circuit_breaker_reset'], run_id=params['run_id'],
+                   node_index_ttl=params['node_index_ttl'])
+
 
 class AxonOps:
     cloud_url: str = "https://dash.axonops.cloud"
 
     def __init__(self, org_name: str, auth_token: str = '', base_url: str = '', username: str = '', password: str = '',
-                 cluster_type: str = 'cassandra', api_token: str = '', override_saas: bool = False):
+                 cluster_type: str = 'cassandra', api_token: str = '', override_saas: bool = False,
+                 pool_size: int = DEFAULT_POOL_SIZE, pool_idle_timeout: float = DEFAULT_POOL_IDLE_TIMEOUT,
+                 token_cache: bool = True, response_cache: bool = True,
+                 response_cache_ttl: float = DEFAULT_RESPONSE_CACHE_TTL,
+                 retry_max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS, retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 retry_jitter: bool = True, rate_limit: float = 0, rate_limit_burst: int = 0,
+                 stats_debug: bool = False, circuit_breaker_threshold: int = DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+                 circuit_breaker_reset: float = DEFAULT_CIRCUIT_BREAKER_RESET, run_id: str = '',
+                 node_index_ttl: float = DEFAULT_NODE_INDEX_TTL):
         self.org_name = org_name
         self.auth_token = auth_token
         self.api_token = api_token
@@ -16,13 +63,28 @@ class AxonOps:
         self.password = password
         self.cluster_type = cluster_type
         self.jwt = ''
+        # do_requests runs in threads, only one of them must login
+        self._jwt_lock = threading.RLock()
+
+        # the integrations of each cluster, read once and updated after the writes
+        self.integration_registries = {}
 
-        # save the integration output to a var so we can use it multiple times
-        self.integrations_output = {}
+        # the nodes of each (org, cluster), kept for node_index_ttl seconds
+        self.node_indexes = {}
+        self.node_index_ttl = node_index_ttl
 
         # collect the errors, will check it on every module
         self.errors = []
 
+        # keep-alive connections shared by all the requests of the process
+        self.pool = get_connection_pool(pool_size, pool_idle_timeout)
+
+        # transient errors are retried
+        self.retry_policy = RetryPolicy(retry_max_attempts, retry_base_delay, retry_jitter)
+
+        # timings and sizes of every call, returned in the module result
+        self.request_stats = RequestStats(debug=stats_debug)
+
         # set the base url
         if base_url:
             # if saas is overridden, the url will always be treated as saas
@@ -36,6 +98,33 @@ class AxonOps:
             # if nothing is specified, it is AxonOps Cloud
             self.base_url = AxonOps.cloud_url + "/" + org_name
 
+        # requests per second allowed to all the processes using this base url, 0 is unlimited
+        self.rate_limiter = None
+        if rate_limit > 0:
+            self.rate_limiter = RateLimiter(self.base_url, rate_limit, rate_limit_burst)
+
+        # fail fast when the previous tasks could not connect to this base url, 0 disables it
+        self.circuit_breaker = None
+        if circuit_breaker_threshold > 0:
+            self.circuit_breaker = CircuitBreaker(self.base_url, circuit_breaker_threshold, circuit_breaker_reset)
+
+        # the JWT is shared on disk with the other module invocations using the same credential
+        self.token_cache = None
+        if token_cache and self.username and self.password:
+            self.token_cache = TokenCache(self.base_url, self.org_name, self.username)
+
+        # the GET responses are shared on disk too, and revalidated with conditional requests
+        self.response_cache = None
+        if response_cache:
+            identity = self.username or self.api_token or self.auth_token or ''
+            self.response_cache = ResponseCache(self.base_url, identity, ttl=response_cache_ttl)
+
+        # the state read by the previous tasks of the same run is used without asking the server again
+        self.snapshot_store = None
+        if run_id:
+            identity = self.username or self.api_token or self.auth_token or ''
+            self.snapshot_store = SnapshotStore(self.base_url, identity, run_id)
+
         # if you have a username and password, it will be used for the login
         if self.username and self.password:
             self.jwt = self.get_jwt()
@@ -48,55 +137,99 @@ class AxonOps:
 
     def get_jwt(self) -> str | None:
         """
-        Get the JWT from the login endpoint
+        Get the JWT from the cache or from the login endpoint
         """
-        # if you have it already, use it
-        if self.jwt:
-            return self.jwt
-        else:
-            json_data = {
-                "username": self.username,
-                "password": self.password
-            }
+        with self._jwt_lock:
+            # if you have it already, use it
+            if self.jwt:
+                return self.jwt
+
+            if self.token_cache is None:
+                self.jwt = self.login() or ''
+                return self.jwt or None
+
+            # only one fork logs in, the others wait and read the token it saved
+            with self.token_cache.lock():
+                self.jwt = self.token_cache.get() or self._login_and_cache()
+            return self.jwt or None
+
+    def refresh_jwt(self, stale_jwt: str) -> str | None:
+        """
+        Replace `stale_jwt`, it is expired or revoked, with a new one
+        """
+        with self._jwt_lock:
+            # another thread has already refreshed it
+            if self.jwt != stale_jwt:
+                return self.jwt or None
+
+            if self.token_cache is None:
+                self.jwt = self.login() or ''
+                return self.jwt or None
+
+            with self.token_cache.lock():
+                self.token_cache.invalidate(stale_jwt)
+                # another fork could have refreshed it already
+                self.jwt = self.token_cache.get() or self._login_and_cache()
+            return self.jwt or None
+
+    def _login_and_cache(self) -> str:
+        token = self.login()
+        if not token:
+            return ''
+        self.token_cache.set(token)
+        return token
+
+    def login(self) -> str | None:
+        """
+        Get a new JWT from the login endpoint
+        """
+        json_data = {
+            "username": self.username,
+            "password": self.password
+        }
 
-            result, return_error = self.do_request("/api/login", json_data=json_data, method='POST')
+        result, return_error = self.do_request("/api/login", json_data=json_data, method='POST', auth=False)
 
-            if return_error:
-                self.errors.append(return_error)
-            if not result or 'token' not in result:
-                self.errors.append(f"{self.base_url}/api/login returned an invalid result {result} {return_error}")
-                return None
-            self.jwt = result['token']
-            return self.jwt
+        if return_error:
+            self.errors.append(return_error)
+        if not result or 'token' not in result:
+            self.errors.append(f"{self.base_url}/api/login returned an invalid result {result} {return_error}")
+            return None
+        return result['token']
 
     def dash_url(self):
         return self.base_url
 
+    def stats(self) -> dict:
+        """
+        the request statistics, added to the module result as `axonops_stats`
+        """
+        return self.request_stats.summary()
+
     def do_request(self, rel_url: str, method: str = 'GET', ok_codes: List[int] = [200, 201, 204],
                    data: any = None,
                    json_data: any = None,
-                   form_field: str = ""):
+                   form_field: str = "",
+                   idempotent: bool = False,
+                   auth: bool = True):
         """
-        Perform a GET request to AxonOps and return the response or an error
+        Perform a request to AxonOps and return the response or an error.
+        Transient errors are retried for GET, and for the other methods only if the endpoint is `idempotent`.
+        The credentials are not sent when `auth` is False, as for the login.
         """
-        # bearer empty is for anonymous
-        bearer = ''
-
-        #
-        api_token = ''
-
-        # if we have auth_token, use it
-        if self.auth_token:
-            bearer = self.auth_token
-
-        # if we have an api token for on prem axonserver instances
-        if self.api_token:
-            api_token = self.api_token
-
-        # if we have jwt, use it
-        if self.jwt:
-            bearer = self.jwt
+        started = time.monotonic()
+        call = {}
+        try:
+            return self._do_request(rel_url, method, ok_codes, data, json_data, form_field, idempotent, auth, call)
+        finally:
+            self.request_stats.record(method, endpoint_template(rel_url, self.org_name, self.cluster_type),
+                                      time.monotonic() - started, **call)
 
+    def _do_request(self, rel_url: str, method: str, ok_codes: List[int], data: any, json_data: any,
+                    form_field: str, idempotent: bool, auth: bool, call: dict):
+        """
+        do_request, the status, sizes and retries are set in `call` for the statistics
+        """
         full_url = self.base_url + '/' + rel_url.lstrip('/')
 
         if data is None and json_data is not None:
@@ -107,16 +240,166 @@ class AxonOps:
             'User-agent': 'AxonOps Ansible Module',
         }
 
-        if bearer:
-            headers['Authorization'] = f'Bearer {bearer}'
-        if api_token:
-            headers['Authorization'] = f'AxonApi {api_token}'
         if form_field != "":
             headers['Content-type'] = 'application/x-www-form-urlencoded'
             data = form_field + "=" + urllib.parse.quote_plus(data)
         elif data is not None:
             headers['Content-type'] = 'application/json'
 
+        # the state already read by this run
+        is_get = method.upper() == 'GET'
+        if is_get and self.snapshot_store is not None:
+            snapshot = self.snapshot_store.get(rel_url)
+            self.request_stats.add_snapshot(hit=snapshot is not None)
+            if snapshot is not None:
+                call.update(status=200, cached=True)
+                return snapshot['data'], None
+
+        # send the validators of the cached response, a 304 means that it is still good
+        cached = None
+        if is_get and self.response_cache is not None:
+            cached = self.response_cache.get(rel_url)
+            if cached and self.response_cache.is_fresh(cached):
+                call.update(status=200, cached=True)
+                return cached['data'], None
+            if cached and cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached and cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        if data is not None:
+            call['bytes_sent'] = len(data.encode('utf-8') if isinstance(data, str) else data)
+
+        requested_at = time.time()
+        sent_jwt = self.jwt
+        try:
+            status, res_headers, content = self._send_with_retry(method, full_url, headers, data, idempotent, auth,
+                                                                 call)
+
+            # the JWT is expired or revoked, login again and retry once
+            if status == 401 and auth and sent_jwt and not self.api_token:
+                if self.refresh_jwt(sent_jwt):
+                    status, res_headers, content = self._send_with_retry(method, full_url, headers, data,
+                                                                         idempotent, auth, call)
+            call.update(status=status, bytes_received=len(content))
+        except Exception as e:
+            return None, str(e) + f" {full_url}"
+        finally:
+            # whatever the outcome, a write makes the cached collection stale
+            if not is_get and self.response_cache is not None:
+                self.response_cache.invalidate(rel_url)
+            if not is_get and self.snapshot_store is not None:
+                self.snapshot_store.invalidate(rel_url)
+
+        if status == 304 and cached:
+            call['cached'] = True
+            if self.snapshot_store is not None:
+                self.snapshot_store.store(rel_url, cached['data'], requested_at)
+            return cached['data'], None
+
+        if status not in ok_codes:
+            return None, f'{full_url} return code is {status}'
+
+        # Not all requests return a response so ignore json decoding errors
+        try:
+            result = json.loads(content)
+        except json.JSONDecodeError:
+            return None, None
+
+        if is_get and self.response_cache is not None and status == 200:
+            self.response_cache.store(rel_url, result, requested_at,
+                                      etag=res_headers.get('ETag'), last_modified=res_headers.get('Last-Modified'))
+        if is_get and self.snapshot_store is not None and status == 200:
+            self.snapshot_store.store(rel_url, result, requested_at)
+        return result, None
+
+    def do_requests(self, requests: List[str | dict], max_workers: int = DEFAULT_GATHER_WORKERS) -> List[tuple]:
+        """
+        Perform independent requests at the same time and return the (result, error) of each one, in order.
+        A request is a relative url to GET or a dict with the do_request arguments.
+        """
+        requests = [{'rel_url': request} if isinstance(request, str) else request for request in requests]
+        if len(requests) <= 1:
+            return [self.do_request(**request) for request in requests]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+            futures = [executor.submit(self.do_request, **request) for request in requests]
+            return [future.result() for future in futures]
+
+    def _auth_headers(self, headers: dict) -> dict:
+        """
+        add the Authorization header for the current credential
+        """
+        # bearer empty is for anonymous
+        bearer = ''
+
+        # if we have auth_token, use it
+        if self.auth_token:
+            bearer = self.auth_token
+
+        # if we have jwt, use it
+        if self.jwt:
+            bearer = self.jwt
+
+        headers = dict(headers)
+        if bearer:
+            headers['Authorization'] = f'Bearer {bearer}'
+        # if we have an api token for on prem axonserver instances
+        if self.api_token:
+            headers['Authorization'] = f'AxonApi {self.api_token}'
+        return headers
+
+    def _send_with_retry(self, method: str, full_url: str, headers: dict, data: any, idempotent: bool, auth: bool,
+                         call: dict):
+        """
+        Send the request, and send it again after a backoff while it fails with a transient error
+        """
+        attempt = 1
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.allow()
+
+            if self.rate_limiter is not None:
+                self.request_stats.add_rate_limit_wait(self.rate_limiter.acquire())
+
+            self.request_stats.add_request()
+            try:
+                send_headers = self._auth_headers(headers) if auth else headers
+                status, res_headers, content = self._send(method, full_url, send_headers, data, idempotent)
+            except Exception as e:
+                retry = isinstance(e, RETRY_ERRORS) and self.retry_policy.can_retry(method, idempotent, attempt)
+                if not retry:
+                    # the request failed for good, it counts once for the circuit breaker
+                    if self.circuit_breaker is not None and is_connection_failure(e):
+                        self.circuit_breaker.failure()
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.success()
+                if status not in RETRY_STATUSES or not self.retry_policy.can_retry(method, idempotent, attempt):
+                    return status, res_headers, content
+                delay = self.retry_policy.delay(attempt, res_headers.get('Retry-After'))
+
+            self.request_stats.add_retry()
+            call['retries'] = call.get('retries', 0) + 1
+            attempt += 1
+            time.sleep(delay)
+
+    def _send(self, method: str, full_url: str, headers: dict, data: any, idempotent: bool = False):
+        """
+        Send the request and return the status, the headers and the raw content
+        """
+        if uses_proxy(full_url):
+            return self._open_url(full_url, method, headers, data)
+
+        res = self.pool.request(method.upper(), full_url, headers=headers, body=data, idempotent=idempotent)
+        return res.status, res.headers, res.body
+
+    def _open_url(self, full_url: str, method: str, headers: dict, data: any):
+        """
+        Perform the request with open_url, used when a proxy is configured for the url
+        """
         res = None
         try:
             with open_url(
@@ -125,106 +408,123 @@ class AxonOps:
                     headers=headers,
                     data=data
             ) as res:
-                if res.status not in ok_codes:
-                    return None, f'{full_url} return code is {res.status}'
-                content = res.read()
-        except Exception as e:
-            return None, str(e) + f" {full_url}"
+                return res.status, res.headers, res.read()
+        except urllib.error.HTTPError as e:
+            # the status is checked by the caller, like for the pooled connections
+            return e.code, e.headers, e.read()
         finally:
             if res is not None:
                 res.close()
 
-        # Not all requests return a response so ignore json decoding errors
-        try:
-            return json.loads(content), None
-        except json.JSONDecodeError:
-            return None, None
+    def get_clusters(self):
+        """
+        get the names of the clusters of the org by cluster type, sorted
+        """
+        org_api_output, error = self.do_request("/api/v1/orgs")
+        if error is not None:
+            return None, error
 
-    def get_integration_output(self, cluster: str):
+        clusters_by_type = {}
+        for organization in org_api_output['children']:
+            for cluster in organization['children']:
+                for datacenter in cluster['children']:
+                    clusters_by_type.setdefault(datacenter['type'], []).append(datacenter['name'])
+
+        return {cluster_type: sorted(names) for cluster_type, names in clusters_by_type.items()}, None
+
+    def integrations_url(self, cluster: str) -> str:
+        return f"/api/v1/integrations/{self.org_name}/{self.get_cluster_type()}/{cluster}"
+
+    def get_integration_registry(self, cluster: str):
         """
-        get the integration output from local variable if present, or from API
+        get the integration registry of the cluster, the integrations are read from the API the first time
         """
         # if we don't have already the integration API output, call the API
-        if cluster not in self.integrations_output:
-            integrations, error = self.do_request(
-                f"/api/v1/integrations/{self.org_name}/{self.get_cluster_type()}/{cluster}")
+        if cluster not in self.integration_registries:
+            integrations, error = self.do_request(self.integrations_url(cluster))
             if error is not None:
                 return None, error
 
             # save the integration output for the next time
-            self.integrations_output[cluster] = integrations
-        return self.integrations_output[cluster], None
+            self.set_integration_output(cluster, integrations)
+        return self.integration_registries[cluster], None
+
+    def set_integration_output(self, cluster: str, integrations: dict):
+        """
+        keep the integrations of the cluster read with other requests
+        """
+        self.integration_registries[cluster] = IntegrationRegistry(integrations)
+
+    def forget_integrations(self, cluster: str):
+        """
+        the integrations of the cluster are read again the next time, after a change the registry can't follow
+        """
+        self.integration_registries.pop(cluster, None)
+
+    def get_integration_output(self, cluster: str):
+        """
+        get the integration output from local variable if present, or from API
+        """
+        registry, error = self.get_integration_registry(cluster)
+        if error is not None:
+            return None, error
+        return registry.integrations, None
 
     def find_integration_by_name_and_type(self, cluster, integration_type, name):
         """
         get the integration by the name and type
         """
-        # Get the list of current integrations
-        integrations, error = self.get_integration_output(cluster)
+        registry, error = self.get_integration_registry(cluster)
         if error is not None:
             return None, error
-
-        definitions = integrations['Definitions'] if 'Definitions' in integrations else []
-
-        # Check if the named integration already exists
-        if definitions:
-            for definition in definitions:
-                if 'Type' in definition and 'Params' in definition and 'name' in definition['Params'] \
-                        and definition['Type'] == integration_type and definition['Params']['name'] == name:
-                    return definition, None
-
-        return None, None
+        return registry.find_by_name_and_type(integration_type, name), None
 
     def find_integration_id_by_name(self, cluster, name):
         """
         get the integration by the name
         """
-        # Get the list of current integrations
-        integrations, error = self.get_integration_output(cluster)
+        registry, error = self.get_integration_registry(cluster)
         if error is not None:
             return None, error
-
-        definitions = integrations['Definitions'] if 'Definitions' in integrations else []
-
-        # Check if the named integration already exists
-        if definitions:
-            for definition in definitions:
-                if 'Params' in definition and 'name' in definition['Params'] and definition['Params']['name'] == name:
-                    return definition["ID"], None
-
-        return None, None
+        return registry.find_id_by_name(name), None
 
     def find_integration_name_by_id(self, cluster, integration_id):
         """
         get the integration by the ID
         """
-        # Get the list of current integrations
-        integrations, error = self.get_integration_output(cluster)
+        registry, error = self.get_integration_registry(cluster)
         if error is not None:
             return None, error
+        return registry.find_name_by_id(integration_id), None
 
-        definitions = integrations['Definitions'] if 'Definitions' in integrations else []
-
-        # find the definition
-        if definitions:
-            for definition in definitions:
-                if definition["ID"] == integration_id:
-                    return definition['Params']['name'], None
+    def get_node_index(self, org: str, cluster: str):
+        """
+        get the nodes of the cluster indexed by host id, IP and human readable identifier,
+        read again from the API when the index is older than its TTL
+        """
+        node_index = self.node_indexes.get((org, cluster))
+        if node_index is None or not node_index.is_fresh():
+            nodes_returned, error = self.do_request(f"api/v1/nodes/{org}/{self.get_cluster_type()}/{cluster}")
+            if error is not None:
+                return None, error
 
-        return None, None
+            node_index = NodeIndex(nodes_returned, ttl=self.node_index_ttl)
+            self.node_indexes[(org, cluster)] = node_index
+        return node_index, None
 
     def find_nodes_ids(self, nodes, org, cluster):
-        nodes_returned, error = self.do_request(f"api/v1/nodes/{org}/{self.get_cluster_type()}/{cluster}")
+        """
+        get the host ids of the nodes given by their host id, IP or human readable identifier,
+        it fails with the nodes that are not in the cluster
+        """
+        if not nodes:
+            return [], None
+
+        node_index, error = self.get_node_index(org, cluster)
         if error is not None:
             return None, error
 
-        list_of_ids = []
-
-        for node in nodes:
-            for node_returned in nodes_returned:
-                details = node_returned['Details']
-                if node == details['human_readable_identifier'] or node == node_returned['HostIP']:
-                    list_of_ids.append(node_returned['host_id'])
-                    break
-
-        return list_of_ids, None
+        host_ids, unknown = node_index.resolve(nodes)
+        if unknown:
+            return None, f"Nodes not found in the cluster {cluster}: {', '.join(unknown)}"
+        return host_ids, None
@@ -0,0 +1,154 @@
+from urllib.parse import quote, unquote
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different
+
+# Type name mapping Ansible => AxonOps
+types_map = {
+    'global': 'Global',
+    'metrics': 'Metrics',
+    'backups': 'Backups',
+    'servicechecks': 'Service%20Checks',
+    'nodes': 'Nodes',
+    'commands': 'Commands',
+    'repairs': 'Repairs',
+    'rollingrestart': 'Rolling%20Restart'
+}
+
+# the options of an alert route, they are the module arguments of alert_route and the items of alert_routes
+ALERT_ROUTE_OPTIONS = {
+    'type': {'type': 'str', 'required': True, 'choices': list(types_map.keys())},
+    'severity': {'type': 'str', 'required': True, 'choices': ['info', 'warning', 'error']},
+    'integration_type': {'type': 'str'},
+    'integration_name': {'type': 'str'},
+    'enable_override': {'type': 'bool', 'required': False, 'default': True},
+    'present': {'type': 'bool', 'default': True},
+}
+
+ALERT_ROUTE_REQUIRED_TOGETHER = [
+    ('integration_type', 'integration_name'),
+]
+
+
+def override_url(axonops: AxonOps, cluster: str, axon_type: str, severity: str) -> str:
+    return (f"api/v1/integrations-override/"
+            f"{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}/{quote(axon_type)}/{severity}")
+
+
+def routing_url(axonops: AxonOps, cluster: str, axon_type: str, severity: str, integration_id: str) -> str:
+    return (f"api/v1/integrations-routing/"
+            f"{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}/{quote(axon_type)}/{severity}/{integration_id}")
+
+
+def index_alert_routes(integrations: dict) -> dict:
+    """
+    The existing routes as a set of (type, severity, integration ID) and the override flags
+    by (type, severity), read once from the Routings of the integrations.
+    The types are not url encoded, e.g. Service Checks.
+    """
+    state = {'routes': set(), 'overrides': {}}
+    for routing in (integrations or {}).get('Routings') or []:
+        if 'Type' not in routing or 'Routing' not in routing:
+            continue
+        axon_type = unquote(routing['Type'])
+        for severity in ['info', 'warning', 'error']:
+            override_property = 'Override' + severity.title()
+            if override_property in routing:
+                state['overrides'][(axon_type, severity)] = routing[override_property]
+        for entry in routing['Routing'] or []:
+            if 'Severity' in entry and 'ID' in entry:
+                state['routes'].add((axon_type, entry['Severity'], entry['ID']))
+    return state
+
+
+def plan_alert_route(route: dict, integration_id: str | None, state: dict) -> dict:
+    """
+    Compare a route with the indexed routes, without calling AxonOps. `integration_id` is the ID of the
+    integration of the route, None when the route only sets the override. The plan has `changed` and `diff`,
+    `override` is the new override flag and `route` is 'post' or 'delete' when they must be changed.
+    """
+    is_global = route['type'] == 'global'
+    axon_type = unquote(types_map[route['type']])
+    key = (axon_type, route['severity'])
+
+    # if it is only a override and it is set, set as exists
+    if integration_id:
+        exists = (axon_type, route['severity'], integration_id) in state['routes']
+    else:
+        exists = not route['integration_name'] and key in state['overrides']
+    old_override_enabled = state['overrides'].get(key, False)
+
+    old_data = {
+        'type': route['type'],
+        'severity': route['severity'],
+        'integration_type': route['integration_type'] or "",
+        'integration_name': route['integration_name'] or "",
+        'present': exists,
+    }
+    new_data = {
+        'type': route['type'],
+        'severity': route['severity'],
+        'integration_type': route['integration_type'] or "",
+        'integration_name': route['integration_name'] or "",
+        'present': route['present'],
+    }
+
+    if not is_global:
+        old_data['enable_override'] = old_override_enabled
+        new_data['enable_override'] = route['enable_override']
+
+    # Work out what changes are required and make the diff
+    changed = dicts_are_different(new_data, old_data)
+    plan = {
+        'changed': changed,
+        'diff': {'before': old_data, 'after': new_data},
+        'type': axon_type,
+        'severity': route['severity'],
+        'integration_id': integration_id,
+        'override': None,
+        'route': None,
+    }
+    if not changed:
+        return plan
+
+    if not is_global and old_data['enable_override'] != new_data['enable_override']:
+        plan['override'] = new_data['enable_override']
+    if integration_id and old_data['present'] != new_data['present']:
+        plan['route'] = 'post' if route['present'] else 'delete'
+    return plan
+
+
+def update_alert_routes_state(state: dict, plan: dict):
+    """
+    apply a plan to the indexed routes, so the next routes are compared with it
+    """
+    if plan['override'] is not None:
+        state['overrides'][(plan['type'], plan['severity'])] = plan['override']
+    if plan['route'] == 'post':
+        state['routes'].add((plan['type'], plan['severity'], plan['integration_id']))
+    elif plan['route'] == 'delete':
+        state['routes'].discard((plan['type'], plan['severity'], plan['integration_id']))
+
+
+def alert_routes_requests(axonops: AxonOps, cluster: str, old_state: dict, new_state: dict) -> list:
+    """
+    the do_request arguments of the minimal changes from `old_state` to `new_state`,
+    the override changes first then the routes to add and to delete
+    """
+    requests = []
+    for (axon_type, severity), value in new_state['overrides'].items():
+        if old_state['overrides'].get((axon_type, severity), False) != value:
+            requests.append({
+                'rel_url': override_url(axonops, cluster, axon_type, severity),
+                'method': 'PUT',
+                'json_data': {'value': value},
+                'idempotent': True,
+            })
+    for method, routes in [('POST', new_state['routes'] - old_state['routes']),
+                           ('DELETE', old_state['routes'] - new_state['routes'])]:
+        for axon_type, severity, integration_id in sorted(routes):
+            requests.append({
+                'rel_url': routing_url(axonops, cluster, axon_type, severity, integration_id),
+                'method': method,
+            })
+    return requests
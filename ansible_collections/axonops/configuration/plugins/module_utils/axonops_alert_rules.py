@@ -0,0 +1,479 @@
+import re
+import uuid
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_dashboard_templates import \
+    DashboardCatalog
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different, \
+    find_by_field, get_value_by_name, normalize_numbers
+
+# the options of an alert rule, they are the module arguments of alert_rule and the items of alert_rules
+ALERT_RULE_OPTIONS = {
+    'name': {'type': 'str', 'default': ''},
+    'description': {'type': 'str', 'default': ''},
+    'dashboard': {'type': 'str', 'required': True},
+    'chart': {'type': 'str', 'required': True},
+    'metric': {'type': 'str', 'default': ''},
+    'operator': {'type': 'str', 'choices': ['=', '>=', '>', '<=', '<', '!=']},
+    'warning_value': {'type': 'float'},
+    'critical_value': {'type': 'float'},
+    'duration': {'type': 'str'},
+    'url_filter': {'type': 'str', 'default': ''},
+    'scope': {'type': 'list', 'default': []},
+    'dc': {'type': 'list', 'default': []},
+    'rack': {'type': 'list', 'default': []},
+    'host_id': {'type': 'list', 'default': []},
+    'group_by': {'type': 'list', 'default': [], 'choices': ['dc', 'host_id', 'rack', 'scope', []]},
+    'routing': {'type': 'dict', 'default': {}},
+    'present': {'type': 'bool', 'default': True},
+    'percentile': {'type': 'list', 'default': [],
+                   'choices': ['', '75thPercentile', '95thPercentile', '98thPercentile', '99thPercentile',
+                               '999thPercentile']},
+    'consistency': {'type': 'list', 'default': [],
+                    'choices': ['', 'ALL', 'ANY', 'ONE', 'TWO', 'THREE', 'SERIAL', 'QUORUM', 'EACH_QUORUM',
+                                'LOCAL_ONE', 'LOCAL_QUORUM', 'LOCAL_SERIAL']},
+    'keyspace': {'type': 'list', 'default': []}
+}
+
+ALERT_RULE_REQUIRED_IF = [
+    ('present', True, ('operator', 'warning_value', 'critical_value', 'duration'))
+]
+
+
+def alert_rule_name(rule: dict) -> str:
+    return rule['name'] or rule['chart']
+
+
+def alerts_url(axonops: AxonOps, cluster: str) -> str:
+    return f"/api/v1/alert-rules/{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}"
+
+
+def fetch_alert_rules_state(axonops: AxonOps, cluster: str, with_integrations: bool):
+    """
+    Get the existing alerts, the dashboard templates of both API versions and, when needed for the routing,
+    the integrations at the same time. Return the state for plan_alert_rule or an error.
+    The dashboard templates are indexed once in a DashboardCatalog for each API version that answered,
+    the version 2.0 first.
+    """
+    org = axonops.org_name
+    dashboard_template_api = f"/api/v1/dashboardtemplate/{org}/{axonops.get_cluster_type()}/{cluster}?dashver=2.0"
+    dashboard_template_api_v1 = f"/api/v1/dashboardtemplate/{org}/{axonops.get_cluster_type()}/{cluster}"
+
+    state_urls = [alerts_url(axonops, cluster), dashboard_template_api, dashboard_template_api_v1]
+    if with_integrations:
+        state_urls.append(axonops.integrations_url(cluster))
+    responses = axonops.do_requests(state_urls)
+
+    existing_alerts, error = responses[0]
+    if error is not None:
+        return None, "Error occurred accessing alert URL: " + alerts_url(axonops, cluster) + str(error)
+
+    if with_integrations and responses[3][1] is None:
+        axonops.set_integration_output(cluster, responses[3][0])
+
+    dash_catalogs = [DashboardCatalog(templates, source=url)
+                     for url, (templates, error) in zip(state_urls[1:3], responses[1:3])
+                     if error is None and templates]
+
+    return {
+        'alerts': existing_alerts,
+        'dash_catalogs': dash_catalogs,
+    }, None
+
+
+def plan_alert_rule(axonops: AxonOps, rule: dict, cluster: str, state: dict):
+    """
+    Compare an alert rule with the existing alerts of the state, without calling AxonOps.
+    Return the plan or an error. The plan has the result keys of alert_rule, and `action` is
+    'post' with the `payload` or 'delete' with the `alert_id` when the rule must be changed.
+    """
+    plan = {
+        'changed': False,
+        'action': None,
+    }
+
+    consistency = rule["consistency"]
+    percentile = rule["percentile"]
+    group_by = rule["group_by"]
+    org = axonops.org_name
+    cluster_type = axonops.get_cluster_type()
+    alert_name = alert_rule_name(rule)
+    url_filter = rule['url_filter'] or 'time=30'
+    existing_alerts = state['alerts']
+
+    # Find the referenced chart in the dashboard templates, try both API versions
+    new_charts = []
+    new_dash = None
+    dash_catalog = None
+    for dash_catalog in state['dash_catalogs']:
+        new_charts = dash_catalog.panels(rule['dashboard'], rule['chart'])
+        if new_charts:
+            new_dash = dash_catalog.dashboard(rule['dashboard'])
+            break
+
+    new_chart = None
+    # if we did not find the chart in any of the dashboard templates, any API versions, fail
+    if not new_charts:
+        return None, f"Could not find chart '{rule['chart']}' in AxonOps"
+
+    # if there is more than one chart, we need to choose the correct one
+    elif len(new_charts) > 1:
+        plan['response'] = new_charts
+
+        for chart in new_charts:
+            # if the chart has a query, use it
+            if 'details' in chart and 'queries' in chart['details'] and chart['details']['queries']:
+                new_chart = chart
+                break
+            # if we find type == 'events_timeline', use it
+            if chart.get('type') in ['events_timeline', 'table']:
+                new_chart = chart
+                break
+
+    else:
+        # we have a single element, we can use it directly
+        new_chart = new_charts[0]
+
+    if not new_chart:
+        return None, f"Could not find chart '{rule['chart']}' in AxonOps dashboard '{rule['dashboard']}'"
+
+    raw_query = None
+    # check if it is an event base alert rather than metrics
+    new_chart_filters = None
+    if new_chart.get('type') in ['events_timeline', 'table']:
+        metric = ''
+        if 'details' in new_chart and 'filters' in new_chart['details']:
+            new_chart_filters = new_chart['details']['filters']
+        else:
+            # find `type` and `level` in the chart details
+            new_chart_filters = {}
+            if 'eventsLevel' in new_chart['details']:
+                new_chart_filters['level'] = ','.join(new_chart['details']['eventsLevel'])
+            if 'eventsType' in new_chart['details']:
+                new_chart_filters['type'] = ','.join(new_chart['details']['eventsType'])
+            if not new_chart_filters:
+                return None, (f"Could not find filters in chart '{rule['chart']}' "
+                              f"in AxonOps dashboard '{rule['dashboard']}'")
+
+    # if it is not, get the chart query if not specified in the params
+    elif not rule['metric']:
+        try:
+            raw_query = new_chart['details']['queries'][0]['query']
+        except (TypeError, IndexError):
+            return None, f'Failed getting the metric query from the specified chart: {new_chart}'
+
+        # remove var similar to: dc=~'$dc',rack=~'$rack', host_id=~'$host_id'
+        raw_query = re.sub(r'(\w+)=~\'([$]\w*)?\',?', '', raw_query)
+
+        # remove eventual last comma
+        raw_query = re.sub(r', *}', r'}', raw_query)
+
+        # remove eventual multiple spaces
+        raw_query = re.sub(r' +', r' ', raw_query)
+
+        # change ($groupBy) to (dc)
+        metric = re.sub(re.escape('($groupBy)'), r'(dc)', raw_query)
+
+    else:
+        metric = rule['metric']
+
+    # Find the existing alert (if present)
+    old_alert = find_by_field(existing_alerts.get('metricrules'), 'alert', alert_name)
+
+    # Nothing to do if the alert doesn't exist, and we don't want it to
+    if not old_alert and not rule['present']:
+        return plan, None
+
+    old_alert_exp = None
+    if old_alert:
+        # Find the current dashboard and widget by parsing the widget url
+        widget_parts = old_alert['annotations']['widget_url'].split('/')
+        old_dash_uuid = None
+        old_widget_uuid = None
+        old_url_filter = None
+        old_dash_name = None
+        old_chart_name = None
+        if len(widget_parts) >= 6:
+            uuid_parts = widget_parts[5].split('?')
+            old_dash_uuid = uuid_parts[0]
+            if len(uuid_parts) > 1:
+                parts2 = uuid_parts[1].split('&')
+                if parts2[0].startswith("uuid="):
+                    old_widget_uuid = parts2[0][5:]
+                else:
+                    old_widget_uuid = parts2[0]
+                if len(parts2) > 1:
+                    old_url_filter = parts2[1]
+
+        if old_dash_uuid:
+            old_dash = dash_catalog.dashboard_by_uuid(old_dash_uuid)
+            if old_dash:
+                old_dash_name = old_dash.get('name')
+                if old_widget_uuid:
+                    old_chart = dash_catalog.panel_by_uuid(old_dash_uuid, old_widget_uuid)
+                    if old_chart:
+                        old_chart_name = old_chart['title']
+        if not old_chart_name:
+            old_chart_name = old_alert.get('alert')
+
+        # Trim the last 2 space-separated sections from the string because they will be the operator and value.
+        # This should leave just the metric
+        old_alert_exp = old_alert['expr']
+        metric = re.sub(' [^ ]+ [^ ]+$', '', old_alert_exp)
+
+        # set the routing and clean the old integration, on a copy as the state can be shared by several rules
+        old_integrations = old_alert.get('integrations', {})
+        if old_integrations:
+            old_integrations = dict(old_integrations)
+            del old_integrations['Type']
+            del old_integrations['OverrideError']
+            del old_integrations['OverrideInfo']
+            del old_integrations['OverrideWarning']
+            old_integrations['Routing'] = [{k: v for k, v in route_item.items() if k != 'Params'}
+                                           for route_item in old_integrations['Routing']]
+
+        old_data = {
+            'name': old_alert.get('alert'),
+            'description': old_alert.get('annotations', {}).get('description', ''),
+            'dashboard': old_dash_name,
+            'chart': old_chart_name,
+            'metric': metric,
+            'operator': old_alert.get('operator', ''),
+            'warning_value': old_alert.get('warningValue', ''),
+            'critical_value': old_alert.get('criticalValue', ''),
+            'duration': old_alert.get('for', ''),
+            'url_filter': old_url_filter or '',
+            'scope': get_value_by_name(old_alert.get('filters', []), 'scope') or [],
+            'dc': get_value_by_name(old_alert.get('filters', []), 'dc') or [],
+            'rack': get_value_by_name(old_alert.get('filters', []), 'rack') or [],
+            'host_id': get_value_by_name(old_alert.get('filters', []), 'host_id') or [],
+            'group_by': get_value_by_name(old_alert.get('filters', []), 'groupBy') or [],
+            'percentile': get_value_by_name(old_alert.get('filters', []), 'percentile') or [],
+            'consistency': get_value_by_name(old_alert.get('filters', []), 'consistency') or [],
+            'keyspace': get_value_by_name(old_alert.get('filters', []), 'keyspace') or [],
+            'integrations': old_integrations,
+            'present': True
+        }
+        plan['old_data'] = old_data
+
+    else:
+        old_data = {'present': False}
+
+    old_data_normalized = normalize_numbers(old_data)
+
+    if rule['present']:
+        new_data = {
+            'name': alert_name,
+            'description': rule['description'],
+            'dashboard': rule['dashboard'],
+            'chart': rule['chart'],
+            'metric': metric,
+            'operator': rule['operator'],
+            'warning_value': rule['warning_value'],
+            'critical_value': rule['critical_value'],
+            'duration': rule['duration'],
+            'url_filter': url_filter,
+            'dc': rule['dc'],
+            'rack': rule['rack'],
+            'host_id': rule['host_id'],
+            'group_by': rule['group_by'],
+            'percentile': percentile,
+            'consistency': consistency,
+            'keyspace': rule['keyspace'],
+            'scope': rule['scope'],
+            'present': True,
+            'integrations': {}
+        }
+    else:
+        new_data = {
+            'name': alert_name,
+            'dashboard': rule['dashboard'],
+            'chart': rule['chart'],
+            'integrations': {},
+            'present': False,
+        }
+
+    # create routing override list
+    routing = []  # format [{id: 'id33s', severity: 'error'},...]
+    for severity in rule['routing']:
+        for override in rule['routing'][severity]:
+            integration_id, error = axonops.find_integration_id_by_name(cluster, override)
+            if error is not None:
+                return None, error
+            routing.append({
+                'ID': integration_id if integration_id else "",
+                'Severity': severity,
+            })
+    if routing:
+        new_data['integrations']['Routing'] = routing
+    elif 'integrations' in new_data:
+        new_data['integrations']['Routing'] = []
+
+    new_data_normalized = normalize_numbers(new_data)
+    # Set up alert expression, there is none when the rule is deleted
+    if not rule['present']:
+        new_expression = None
+    elif 'details' in new_chart and 'queries' in new_chart['details'] and new_chart['details']['queries']:
+        orig_query = new_chart['details']['queries'][0]['query']
+        pattern = re.compile(r"\{([^}]*)\}")
+        match = pattern.search(orig_query)
+        label_filters_str = match.group(1)
+        labels = [label.strip() for label in label_filters_str.split(",")]
+        filtered_labels = [lbl for lbl in labels if '$' not in lbl]
+        reconstructed_filters = ",".join(filtered_labels)
+        cleaned_expr = pattern.sub('{' + reconstructed_filters + '}', orig_query)
+
+        group_by_expr = ""
+        if len(group_by) > 0:
+            group_by_list = ",".join(group_by)
+            group_by_expr = f"{group_by_list}"
+
+        pattern = re.compile(r'by \([^\)]*\)')
+        expression_updated_groupby = pattern.sub('by (' + group_by_expr + ')', cleaned_expr)
+
+        consistency_filter = ""
+        percentile_filter = ""
+        keyspace_filter = ""
+        scope_filter = ""
+        dc_filter = ""
+        rack_filter = ""
+        host_id_filter = ""
+
+        if rule['consistency']:
+            consistecy_list = ",".join(rule['consistency'])
+            consistency_filter = f",consistency='{consistecy_list}'"
+        if rule['percentile']:
+            percentile_list = ",".join(rule['percentile'])
+            percentile_filter = f",percentile='{percentile_list}'"
+        if rule['keyspace']:
+            keyspace_list = ",".join(rule['keyspace'])
+            keyspace_filter = f",keyspace='{keyspace_list}'"
+        if rule['scope']:
+            scope_list = ",".join(rule['scope'])
+            scope_filter = f",scope='{scope_list}'"
+        if rule['dc']:
+            dc_list = ",".join(rule['dc'])
+            dc_filter = f",dc='{dc_list}'"
+        if rule['rack']:
+            rack_list = ",".join(rule['rack'])
+            rack_filter = f",rack='{rack_list}'"
+        if rule['host_id']:
+            host_id_list = ",".join(rule['host_id'])
+            host_id_filter = f",host_id='{host_id_list}'"
+
+        new_filters = consistency_filter + percentile_filter + keyspace_filter + scope_filter + dc_filter + rack_filter + host_id_filter
+
+        pattern = re.compile(r'\{([^}]*)\}')
+        match = pattern.search(expression_updated_groupby)
+
+        existing_filters = match.group(1).strip()
+        plan['existing_filters'] = existing_filters
+        to_apply_filters = existing_filters + new_filters
+        plan['to_apply_filters'] = to_apply_filters
+        new_expression = (pattern.sub('{' + to_apply_filters + '}', expression_updated_groupby)
+                          + " " + rule['operator'] + " " + str(rule['warning_value']))
+        plan['new_expression'] = new_expression
+        plan['new_data'] = new_data
+    elif new_chart.get('type') in ['events_timeline', 'table']:
+        filters = []
+        if rule['host_id']:
+            host_id_list = ",".join(rule['host_id'])
+            filters.append(f"host_id='{host_id_list}'")
+        else:
+            filters.append("host_id=''")
+        if new_chart_filters.get('level'):
+            filters.append(f"level='{new_chart_filters['level']}'")
+        if new_chart_filters['type']:
+            filters.append(f"type='{new_chart_filters['type']}'")
+        expression = ','.join(filters)
+        new_expression = ("events{" + expression + "} "
+                          + rule['operator'] + " "
+                          + str(rule['warning_value']))
+    else:
+        return None, "The alert is not looking as metric or event either. Not implemented"
+
+    changed = dicts_are_different(new_data_normalized, old_data_normalized)
+
+    # if the 2 queries are present and different sign it as changed
+    if new_expression and old_alert_exp and new_expression != old_alert_exp:
+        changed = True
+
+    plan['changed'] = changed
+    plan['diff'] = {'before': old_data_normalized, 'after': new_data_normalized}
+
+    if not changed:
+        return plan, None
+
+    # Delete the alert rule if present is False
+    if not rule['present']:
+        plan['action'] = 'delete'
+        plan['alert_id'] = old_alert["id"]
+        return plan, None
+
+    # Create or update the alert rule
+    payload = {
+        'alert': alert_name,
+        'for': rule['duration'],
+        'operator': rule['operator'],
+        'warningValue': rule['warning_value'],
+        'criticalValue': rule['critical_value'],
+        'annotations': {
+            'description': rule['description'],
+            'summary': "%s is %s than %s (current value: {{$value}})" % (
+                alert_name, rule['operator'], rule['warning_value']),
+            'widget_url': "/%s/%s/%s/performance/%s?uuid=%s&%s" % (
+                org, cluster_type, cluster, new_dash['uuid'], new_chart['uuid'], url_filter),
+        },
+        'integrations': new_data['integrations'],
+        'expr': new_expression,
+        'widgetTitle': rule['chart'],
+        'id': old_alert["id"] if old_alert else str(uuid.uuid4()),
+        'correlationId': new_chart['uuid'],
+        'filters': [
+            {
+                "Name": "consistency",
+                "Value": consistency
+            },
+            {
+                "Name": "percentile",
+                "Value": percentile
+            },
+            {
+                "Name": "keyspace",
+                "Value": rule['keyspace']
+            },
+            {
+                "Name": "scope",
+                "Value": rule['scope']
+            },
+            {
+                "Name": "dc",
+                "Value": rule["dc"]
+            },
+            {
+                "Name": "rack",
+                "Value": rule["rack"]
+            },
+            {
+                "Name": "host_id",
+                "Value": rule["host_id"]
+            },
+            {
+                "Name": "groupBy",
+                "Value": rule["group_by"]
+            }
+        ]
+    }
+
+    plan['action'] = 'post'
+    plan['payload'] = payload
+    return plan, None
+
+
+def alert_rule_request(axonops: AxonOps, cluster: str, plan: dict) -> dict:
+    """
+    the do_request arguments that apply the plan
+    """
+    if plan['action'] == 'delete':
+        return {'rel_url': alerts_url(axonops, cluster) + '/' + plan['alert_id'], 'method': 'DELETE'}
+    return {'rel_url': alerts_url(axonops, cluster), 'method': 'POST', 'json_data': plan['payload']}
@@ -0,0 +1,353 @@
+import json
+import uuid
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different, \
+    string_to_bool, string_or_none, bool_to_string
+
+# the options of a backup, they are the module arguments of backup and the items of backups
+BACKUP_OPTIONS = {
+    'present': {'type': 'bool', 'default': True},
+    'local_retention': {'type': 'str', 'default': "10d"},
+    'remote_path': {'type': 'str', 'required': False, 'default': ''},
+    'remote_retention': {'type': 'str', 'default': "60d"},
+    'remote_type': {'type': 'str', 'required': False, 'default': 'local', 'choices': ['local', 's3', 'sftp', 'azure']},
+    'timeout': {'type': 'str', 'default': "10h"},
+    'transfers': {'type': 'int', 'default': 1},
+    'remote': {'type': 'bool', 'default': False},
+    'tps_limit': {'type': 'int', 'default': 50},
+    'bw_limit': {'type': 'str', 'required': False, 'default': ''},
+    # 'dynamic_remote_fields': {'type':'list', 'default': []},
+    'tag': {'type': 'str', 'required': True},
+    'datacenters': {'type': 'list', 'required': True},
+    'nodes': {'type': 'list', 'default': []},
+    'tables_keyspace': {'type': 'list'},
+    'tables': {'type': 'list'},
+    'keyspaces': {'type': 'list', 'default': []},
+    'schedule': {'type': 'bool', 'default': True},
+    'schedule_expr': {'type': 'str', 'default': '0 1 * * *'},
+    # AWS S3 remote only
+    's3_region': {'type': 'str'},
+    's3_access_key_id': {'type': 'str'},
+    's3_secret_access_key': {'type': 'str'},
+    's3_storage_class': {'required': False, 'default': 'STANDARD',
+                         'choices': ['default', 'STANDARD', 'reduced_redundancy',
+                                     'standard_ia', 'onezone_ia', 'glacier', 'deep_archive',
+                                     'intelligent_tiering']},
+    's3_acl': {'required': False, 'default': 'private', 'choices': ['private', 'public-read', 'public-read-write',
+                                                                    'authenticated-read', 'bucket-owner-read']},
+    's3_encryption': {'required': False, 'default': 'AES256', 'choices': ['none', 'AES256']},
+    's3_no_check_bucket': {'type': 'bool', 'default': False},
+    's3_disable_checksum': {'type': 'bool', 'default': False},
+    # SSH/SFTP remote only
+    'host': {'type': 'str'},
+    'ssh_user': {'type': 'str', 'required': False, 'default': ''},
+    'ssh_pass': {'type': 'str', 'required': False, 'default': ''},
+    'key_file': {'type': 'str', 'required': False, 'default': ''},
+    # Azure Blob only
+    'azure_account': {'type': 'str'},
+    'azure_endpoint': {'type': 'str', 'required': False},
+    'azure_key': {'type': 'str', 'required': False},
+    'azure_use_msi': {'type': 'bool', 'default': False},
+    'azure_msi_object_id': {'type': 'str', 'required': False},
+    'azure_msi_client_id': {'type': 'str', 'required': False},
+    'azure_msi_mi_res_id': {'type': 'str', 'required': False},
+}
+
+BACKUP_REQUIRED_IF = [
+    ('remote', True, ('remote_path', 'remote_type',)),
+    ('remote_type', 's3', ('s3_region',)),
+    ('remote_type', 'azure', ('azure_account',))
+]
+
+BACKUP_MUTUALLY_EXCLUSIVE = [
+    ('tables', 'keyspaces'),
+    ('tables_keyspace', 'keyspaces'),
+    ('azure_msi_object_id', 'azure_msi_client_id', 'azure_msi_mi_res_id')
+]
+
+BACKUP_REQUIRED_TOGETHER = [
+    ('tables', 'tables_keyspace'),
+]
+
+
+def schedule_snapshot_url(axonops: AxonOps, cluster: str) -> str:
+    return f"/api/v1/cassandraScheduleSnapshot/{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}"
+
+
+def cassandra_snapshot_url(axonops: AxonOps, cluster: str) -> str:
+    return f"/api/v1/cassandraSnapshot/{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}"
+
+
+def index_backups(saas_backups: dict) -> dict:
+    """
+    Decode the scheduled snapshots once and index them by tag, with the parsed BackupDetails and RemoteConfig.
+    The last snapshot of a tag wins.
+    """
+    index = {}
+    for backup in saas_backups.get('ScheduledSnapshots') or []:
+        for param in backup['Params']:
+            if "BackupDetails" not in param:
+                continue
+            backup_details = json.loads(param['BackupDetails'])
+            if 'tag' not in backup_details:
+                continue
+
+            remote_config = {}
+            for remote_config_string in backup_details.get('RemoteConfig', '').split('\n'):
+                parts = remote_config_string.split('=', 1)
+                if len(parts) > 1:
+                    remote_config[parts[0].strip()] = parts[1].strip()
+
+            index[backup_details['tag']] = {
+                'backup': backup,
+                'details': backup_details,
+                'remote_config': remote_config,
+            }
+    return index
+
+
+def current_backup_setting(existing: dict | None) -> dict:
+    """
+    the setting of an indexed backup, in the format of the module arguments
+    """
+    if not existing:
+        # if new backup
+        return {
+            'present': False,
+        }
+
+    existing_backup = existing['backup']
+    existing_backup_details = existing['details']
+    remote_config = existing['remote_config']
+    remote_type = existing_backup_details.get('remoteType')
+
+    current_setting = {
+        'present': True,
+        'ID': existing_backup['ID'],
+        'local_retention': existing_backup_details['LocalRetentionDuration'],
+    }
+
+    if existing_backup_details['RemoteConfig'] != '' and remote_type in ('s3', 'sftp', 'azure'):
+        current_setting.update({
+            'remote_path': existing_backup_details['remotePath'],
+            'remote_retention': existing_backup_details['RemoteRetentionDuration'],
+            'remote_type': existing_backup_details['remoteType'],
+            'timeout': existing_backup_details['timeout'],
+            'transfers': existing_backup_details['transfers'],
+            'remote': True,
+            'tps_limit': existing_backup_details['tpslimit'],
+            'bw_limit': existing_backup_details['bwlimit'],
+        })
+    else:
+        # for local only backups
+        current_setting['remote'] = False
+
+    current_setting.update({
+        'tag': existing_backup_details['tag'],
+        'datacenters': existing_backup_details['datacenters'],
+        'nodes': existing_backup_details['nodes'] if 'nodes' in existing_backup_details else [],
+        'tables': existing_backup_details['tables'] if 'tables' in existing_backup_details else [],
+        'keyspaces': existing_backup_details['keyspaces'] if 'keyspaces' in existing_backup_details else [],
+        'schedule': existing_backup_details['schedule'],
+        'schedule_expr': existing_backup_details['scheduleExpr'],
+    })
+
+    if not current_setting['remote']:
+        return current_setting
+
+    # for remote backups s3
+    if remote_type == 's3':
+        current_setting.update({
+            's3_region': string_or_none(remote_config.get('region')),
+            's3_access_key_id': string_or_none(remote_config.get('access_key_id')),
+            's3_secret_access_key': string_or_none(remote_config.get('secret_access_key')),
+            's3_storage_class': string_or_none(remote_config.get('storage_class')),
+            's3_acl': string_or_none(remote_config.get('acl')),
+            's3_encryption': string_or_none(remote_config.get('server_side_encryption')),
+            's3_no_check_bucket': string_to_bool(remote_config.get('no_check_bucket')),
+            's3_disable_checksum': string_to_bool(remote_config.get('disable_checksum')),
+        })
+    elif remote_type == 'sftp':
+        current_setting.update({
+            'host': remote_config['host'] if 'host' in remote_config else '',
+            'ssh_user': remote_config['user'] if 'user' in remote_config else '',
+            'ssh_pass': remote_config['pass'] if 'pass' in remote_config else '',
+            'key_file': remote_config['key_file'] if 'key_file' in remote_config else ''
+        })
+    elif remote_type == 'azure':
+        current_setting.update({
+            'azure_account': string_or_none(remote_config.get('account')),
+            'azure_endpoint': string_or_none(remote_config.get('endpoint')),
+            'azure_key': string_or_none(remote_config.get('key')),
+            'azure_use_msi': string_to_bool(remote_config.get('use_msi')),
+            'azure_msi_object_id': string_or_none(remote_config.get('msi_object_id')),
+            'azure_msi_client_id': string_or_none(remote_config.get('msi_client_id')),
+            'azure_msi_mi_res_id': string_or_none(remote_config.get('msi_mi_res_id')),
+        })
+    return current_setting
+
+
+def plan_backup(backup: dict, existing: dict | None, requested_nodes: list):
+    """
+    Compare a backup with the indexed backup of the same tag, without calling AxonOps.
+    Return the plan or an error. The plan has `changed` and `diff`, `existing_id` is the ID of the
+    scheduled snapshot to delete and `payload` the snapshot to create when the backup is present.
+    """
+    current_setting = current_backup_setting(existing)
+    existing_backup = existing['backup'] if existing else None
+
+    # check if user has specified a keyspace
+    if backup['keyspaces']:
+        requested_keyspaces = backup['keyspaces']
+    elif backup['tables_keyspace']:
+        requested_keyspaces = backup['tables_keyspace']
+    else:
+        requested_keyspaces = []
+
+    # check if user has specified a table
+    requested_tables = []
+    for table in backup['tables'] or []:
+        split = table.split('.')
+        requested_tables.append({'Name': split[1]})
+
+    requested_setting = {
+        'present': backup['present'],
+        'ID': existing_backup['ID'] if existing_backup else str(uuid.uuid4()),
+        'local_retention': backup['local_retention'],
+    }
+
+    # if remote backup
+    if backup['remote']:
+        if backup['remote_type'] not in ('s3', 'sftp', 'azure'):
+            return None, f"remote type {backup['remote_type']} unsupported"
+
+        requested_setting.update({
+            'remote_path': backup['remote_path'],
+            'remote_retention': backup['remote_retention'],
+            'remote_type': backup['remote_type'].lower(),
+            'timeout': backup['timeout'],
+            'transfers': backup['transfers'],
+            'remote': backup['remote'],
+            'tps_limit': backup['tps_limit'],
+            'bw_limit': backup['bw_limit'],
+        })
+    else:
+        # for local only
+        requested_setting['remote'] = backup['remote']
+
+    requested_setting.update({
+        'tag': backup['tag'],
+        'datacenters': backup['datacenters'],
+        'nodes': requested_nodes,
+        'tables': requested_tables,
+        'keyspaces': requested_keyspaces,
+        'schedule': backup['schedule'],
+        'schedule_expr': backup['schedule_expr'],
+    })
+
+    # if the backup is remote, create the remote_config accordingly
+    if requested_setting['remote']:
+        if requested_setting['remote_type'] == 's3':
+            requested_setting.update({field: backup[field] for field in [
+                's3_region', 's3_access_key_id', 's3_secret_access_key', 's3_storage_class', 's3_acl',
+                's3_encryption', 's3_no_check_bucket', 's3_disable_checksum']})
+
+            remote_config_dict = {
+                'type': requested_setting['remote_type'],
+                'provider': 'AWS',
+                'region': requested_setting['s3_region'],
+                'acl': requested_setting['s3_acl'],
+                'server_side_encryption': requested_setting['s3_encryption'],
+                'storage_class': requested_setting['s3_storage_class'],
+                'no_check_bucket': bool_to_string(requested_setting['s3_no_check_bucket']),
+                'disable_checksum': bool_to_string(requested_setting['s3_disable_checksum']),
+            }
+
+            if requested_setting['s3_secret_access_key'] and requested_setting['s3_access_key_id']:
+                remote_config_dict['env_auth'] = 'false'
+                remote_config_dict['access_key_id'] = requested_setting['s3_access_key_id']
+                remote_config_dict['secret_access_key'] = requested_setting['s3_secret_access_key']
+            else:
+                remote_config_dict['env_auth'] = 'true'
+        elif requested_setting['remote_type'] == 'sftp':
+            requested_setting.update({field: backup[field] for field in ['host', 'ssh_user', 'ssh_pass', 'key_file']})
+
+            remote_config_dict = {
+                'type': requested_setting['remote_type'],
+                'host': requested_setting['host'],
+                'user': requested_setting['ssh_user'],
+                'pass': requested_setting['ssh_pass'] if 'ssh_pass' in requested_setting else '',
+                'port': requested_setting['port'] if 'port' in requested_setting else '',
+                'key_file': requested_setting['key_file'] if 'key_file' in requested_setting else '',
+            }
+        else:
+            requested_setting.update({field: backup[field] for field in [
+                'azure_account', 'azure_endpoint', 'azure_key', 'azure_use_msi', 'azure_msi_object_id',
+                'azure_msi_client_id', 'azure_msi_mi_res_id']})
+
+            # Note if use_msi is true then need to unset env_auth
+            remote_config_dict = {
+                'type': 'azureblob',
+                'account': requested_setting['azure_account'],
+            }
+
+            if requested_setting.get('azure_use_msi'):
+                remote_config_dict['use_msi'] = 'true'
+                if requested_setting['azure_msi_object_id']:
+                    remote_config_dict['msi_object_id '] = requested_setting['azure_msi_object_id']
+                if requested_setting['azure_msi_client_id']:
+                    remote_config_dict['msi_client_id '] = requested_setting['azure_msi_client_id']
+                if requested_setting['azure_msi_mi_res_id']:
+                    remote_config_dict['msi_mi_res_id '] = requested_setting['azure_msi_mi_res_id']
+
+        # transform the dict in the prom like format needed by AxonOps
+        remote_config = "\n".join([f"{k} = {v}" for k, v in remote_config_dict.items()])
+
+        payload = {
+            'ID': requested_setting['ID'],
+            'LocalRetentionDuration': requested_setting['local_retention'],
+            'remoteConfig': remote_config,
+            'remotePath': requested_setting['remote_path'],
+            'RemoteRetentionDuration': requested_setting['remote_retention'],
+            'remoteType': requested_setting['remote_type'],
+            'timeout': requested_setting['timeout'],
+            'transfers': requested_setting['transfers'],
+            'Remote': requested_setting['remote'],
+            'tpslimit': requested_setting['tps_limit'],
+            'bwlimit': requested_setting['bw_limit'],
+            'tag': requested_setting['tag'],
+            'datacenters': requested_setting['datacenters'],
+            'nodes': requested_setting['nodes'],
+            'tables': requested_setting['tables'],
+            'allTables': len(requested_setting['tables']) == 0,
+            'allNodes': len(requested_setting['nodes']) == 0,
+            'keyspaces': requested_setting['keyspaces'],
+            'schedule': requested_setting['schedule'],
+            'scheduleExpr': requested_setting['schedule_expr'],
+        }
+    else:
+        payload = {  # only for local backups
+            'ID': requested_setting['ID'],
+            'LocalRetentionDuration': requested_setting['local_retention'],
+            'Remote': False,
+            'tag': requested_setting['tag'],
+            'datacenters': requested_setting['datacenters'],
+            'nodes': requested_setting['nodes'],
+            'tables': requested_setting['tables'],
+            'keyspaces': requested_setting['keyspaces'],
+            'schedule': requested_setting['schedule'],
+            'scheduleExpr': requested_setting['schedule_expr'],
+        }
+
+    # a missing backup that must not be present is not a change
+    if not backup['present'] and not existing_backup:
+        changed = False
+    else:
+        changed = dicts_are_different(current_setting, requested_setting)
+    return {
+        'changed': changed,
+        'diff': {'before': current_setting, 'after': requested_setting},
+        'existing_id': existing_backup['ID'] if changed and existing_backup else None,
+        'payload': payload if changed and requested_setting['present'] else None,
+    }, None
@@ -0,0 +1,299 @@
+import base64
+import contextlib
+import fcntl
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+
+DEFAULT_TOKEN_TTL = 3600
+
+# don't hand out tokens that are about to expire
+TOKEN_EXPIRY_MARGIN = 60
+
+
+def cache_dir() -> str:
+    """
+    The directory on the controller where the state shared between the module invocations is stored.
+    AXONOPS_CACHE_DIR wins, then the Ansible local temp directory.
+    """
+    directory = os.environ.get('AXONOPS_CACHE_DIR')
+    if not directory:
+        local_temp = os.environ.get('ANSIBLE_LOCAL_TEMP') or os.path.join(os.path.expanduser('~'), '.ansible', 'tmp')
+        directory = os.path.join(local_temp, 'axonops')
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
+
+
+def cache_key(*parts: str) -> str:
+    """
+    hash the parts to a string usable as file name
+    """
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+@contextlib.contextmanager
+def locked_file(path: str, shared: bool = False):
+    """
+    Hold a lock on path + '.lock' so that concurrent forks don't step on each other
+    """
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def read_json_file(path: str):
+    """
+    read a json file, None if it does not exist or it is not valid
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_file(path: str, data: any):
+    """
+    write a json file readable only by the owner, the file is replaced atomically
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def remove_file(path: str):
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+
+def jwt_expiry(token: str) -> float:
+    """
+    read the expiry time from the `exp` claim of the JWT, or use the default TTL if it can't be read
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + DEFAULT_TOKEN_TTL
+
+
+class TokenCache:
+    """
+    JWT cache on the controller shared by all the module invocations using the same credential
+    """
+
+    def __init__(self, base_url: str, org_name: str, username: str, directory: str = ''):
+        self.path = os.path.join(directory or cache_dir(), 'jwt-' + cache_key(base_url, org_name, username) + '.json')
+
+    def lock(self):
+        """
+        lock the cache, held while logging in so that only one fork does it
+        """
+        return locked_file(self.path)
+
+    def get(self) -> str | None:
+        """
+        get the cached token if it is not expired
+        """
+        cached = read_json_file(self.path)
+        if not cached or 'token' not in cached:
+            return None
+        if cached.get('expires', 0) - TOKEN_EXPIRY_MARGIN < time.time():
+            return None
+        return cached['token']
+
+    def set(self, token: str):
+        write_json_file(self.path, {'token': token, 'expires': jwt_expiry(token)})
+
+    def invalidate(self, token: str):
+        """
+        remove the token from the cache, unless somebody else has already replaced it
+        """
+        cached = read_json_file(self.path)
+        if cached and cached.get('token') == token:
+            remove_file(self.path)
+
+
+DEFAULT_RESPONSE_CACHE_TTL = 10.0
+
+# writes on these endpoints change the collection served by another endpoint
+RELATED_COLLECTIONS = {
+    'integrations-routing': 'integrations',
+    'integrations-override': 'integrations',
+    'cassandraSnapshot': 'cassandraScheduleSnapshot',
+    'humanReadableId': 'clusterSettings',
+}
+
+
+def collection_path(rel_url: str) -> str:
+    """
+    The collection a relative url belongs to, e.g. api/v1/alert-rules/<org>/<type>/<cluster> for
+    /api/v1/alert-rules/<org>/<type>/<cluster>/<id>, without the query string
+    """
+    parts = [part for part in rel_url.split('?', 1)[0].split('/') if part]
+    if len(parts) >= 3 and parts[0] == 'api' and parts[1] == 'v1':
+        parts[2] = RELATED_COLLECTIONS.get(parts[2], parts[2])
+        parts = parts[:6]
+    return '/'.join(parts)
+
+
+class ResponseCache:
+    """
+    GET responses stored on the controller, one file per collection so that a write invalidates all its variants.
+    Responses with an ETag or a Last-Modified are revalidated with a conditional GET,
+    the others are served for `ttl` seconds.
+    """
+
+    def __init__(self, base_url: str, identity: str, ttl: float = DEFAULT_RESPONSE_CACHE_TTL, directory: str = ''):
+        self.base_url = base_url
+        self.identity = identity
+        self.ttl = ttl
+        self.directory = directory or cache_dir()
+
+    def _path(self, rel_url: str) -> str:
+        key = cache_key(self.base_url, self.identity, collection_path(rel_url))
+        return os.path.join(self.directory, 'response-' + key + '.json')
+
+    @staticmethod
+    def _url_key(rel_url: str) -> str:
+        return '/' + rel_url.lstrip('/')
+
+    def get(self, rel_url: str) -> dict | None:
+        """
+        get the cached entry for the url, it has `data`, `stored` and the validators
+        """
+        path = self._path(rel_url)
+        with locked_file(path, shared=True):
+            collection = read_json_file(path) or {}
+        return collection.get('entries', {}).get(self._url_key(rel_url))
+
+    def is_fresh(self, entry: dict) -> bool:
+        """
+        entries without validators can be used without asking the server until the TTL expires
+        """
+        if entry.get('etag') or entry.get('last_modified'):
+            return False
+        return time.time() - entry.get('stored', 0) < self.ttl
+
+    def store(self, rel_url: str, data: any, requested_at: float, etag: str = None, last_modified: str = None):
+        """
+        store the response of a GET sent at `requested_at`
+        """
+        # nothing to store if it can't be revalidated and can't be served from the TTL either
+        if not etag and not last_modified and self.ttl <= 0:
+            return
+
+        path = self._path(rel_url)
+        with locked_file(path):
+            collection = read_json_file(path) or {}
+
+            # the collection was written while the GET was running, the response could be stale
+            if requested_at < collection.get('invalidated', 0):
+                return
+
+            # drop the expired entries that can't be revalidated
+            entries = {url: entry for url, entry in collection.get('entries', {}).items()
+                       if entry.get('etag') or entry.get('last_modified') or self.is_fresh(entry)}
+            entries[self._url_key(rel_url)] = {
+                'data': data,
+                'etag': etag,
+                'last_modified': last_modified,
+                'stored': time.time(),
+            }
+            collection['entries'] = entries
+            write_json_file(path, collection)
+
+    def invalidate(self, rel_url: str):
+        """
+        forget all the responses of the collection the url belongs to
+        """
+        path = self._path(rel_url)
+        with locked_file(path):
+            write_json_file(path, {'invalidated': time.time(), 'entries': {}})
+
+
+DEFAULT_CLUSTERS_CACHE_TTL = 300.0
+
+
+class ClustersCache:
+    """
+    The clusters of an org by cluster type, stored on the controller per URL, org and identity
+    and used without asking AxonOps for `ttl` seconds
+    """
+
+    def __init__(self, base_url: str, org: str, identity: str, ttl: float = DEFAULT_CLUSTERS_CACHE_TTL,
+                 directory: str = ''):
+        self.ttl = ttl
+        self.path = os.path.join(directory or cache_dir(), 'clusters-' + cache_key(base_url, org, identity) + '.json')
+
+    def get(self) -> dict | None:
+        """
+        the cached clusters, None if there are none or they are older than the TTL
+        """
+        with locked_file(self.path, shared=True):
+            cached = read_json_file(self.path)
+        if not cached or time.time() - cached.get('stored', 0) >= self.ttl:
+            return None
+        return cached.get('clusters')
+
+    def store(self, clusters: dict):
+        if self.ttl <= 0:
+            return
+        with locked_file(self.path):
+            write_json_file(self.path, {'clusters': clusters, 'stored': time.time()})
+
+
+# the snapshots of the runs that ended are removed after this time
+SNAPSHOT_MAX_AGE = 86400
+
+
+class SnapshotStore(ResponseCache):
+    """
+    The GET responses of a playbook run, shared by all its tasks and served without asking the server.
+    The responses are stored by run, URL, identity and collection (org, cluster type, cluster and endpoint),
+    and a write of the run to a collection invalidates it.
+    """
+
+    def __init__(self, base_url: str, identity: str, run_id: str, directory: str = ''):
+        root = directory or cache_dir()
+        super().__init__(base_url, identity, ttl=math.inf,
+                         directory=os.path.join(root, 'snapshot-' + cache_key(run_id)))
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.prune(root)
+
+    def prune(self, root: str):
+        """
+        remove the snapshots of the other runs that were not used for SNAPSHOT_MAX_AGE
+        """
+        now = time.time()
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if not name.startswith('snapshot-') or path == self.directory:
+                continue
+            try:
+                if now - os.path.getmtime(path) > SNAPSHOT_MAX_AGE:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def is_fresh(self, entry: dict) -> bool:
+        """
+        the entries are good for the whole run
+        """
+        return True
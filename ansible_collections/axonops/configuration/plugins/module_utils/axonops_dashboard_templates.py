@@ -0,0 +1,136 @@
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different
+
+# the options of a dashboard, they are the module arguments of dashboard_template and the items of dashboard_templates
+DASHBOARD_TEMPLATE_OPTIONS = {
+    'present': {'type': 'bool', 'required': False, 'default': True},
+    'name': {'type': 'str', 'required': True},
+    'filters': {'type': 'list', 'required': False},
+    'panels': {'type': 'list', 'required': False},
+    # exported dashboards have the uuid given by AxonOps, it is accepted and not compared
+    'uuid': {'type': 'str', 'required': False},
+}
+
+
+def dashboard_templates_url(axonops: AxonOps, cluster: str) -> str:
+    # e.g  http://127.0.0.1:3000/api/v1/dashboardtemplate/demo/cassandra/demo-cluster
+    return f"/api/v1/dashboardtemplate/{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}?dashver=2.0"
+
+
+def index_dashboard_templates(old_templates: dict) -> dict:
+    """
+    the existing dashboards by name, the last one of a name wins
+    """
+    return {old_template['name']: old_template for old_template in old_templates.get('dashboards') or []
+            if 'name' in old_template}
+
+
+class DashboardCatalog:
+    """
+    The dashboards of a dashboard templates response, indexed once: the dashboards by name and by uuid,
+    the panels by (dashboard name, title) and by (dashboard uuid, panel uuid).
+    The first dashboard of a name or uuid wins. `source` is the url that served the templates.
+    """
+
+    def __init__(self, templates: dict, source: str = ''):
+        self.source = source
+        self.dashboards_by_name = {}
+        self.dashboards_by_uuid = {}
+        self.panels_by_title = {}
+        self.panels_by_uuid = {}
+
+        for dashboard in (templates or {}).get('dashboards') or []:
+            self.dashboards_by_name.setdefault(dashboard.get('name'), dashboard)
+            if dashboard.get('uuid'):
+                self.dashboards_by_uuid.setdefault(dashboard['uuid'], dashboard)
+
+        for name, dashboard in self.dashboards_by_name.items():
+            for panel in dashboard.get('panels') or []:
+                self.panels_by_title.setdefault((name, panel.get('title')), []).append(panel)
+
+        for dashboard_uuid, dashboard in self.dashboards_by_uuid.items():
+            for panel in dashboard.get('panels') or []:
+                if panel.get('uuid'):
+                    self.panels_by_uuid.setdefault((dashboard_uuid, panel['uuid']), panel)
+
+    def dashboard(self, name: str) -> dict | None:
+        return self.dashboards_by_name.get(name)
+
+    def dashboard_by_uuid(self, dashboard_uuid: str) -> dict | None:
+        return self.dashboards_by_uuid.get(dashboard_uuid)
+
+    def panels(self, dashboard_name: str, title: str) -> list:
+        """
+        the panels of a dashboard with a title, in the order of the dashboard
+        """
+        return self.panels_by_title.get((dashboard_name, title), [])
+
+    def panel_by_uuid(self, dashboard_uuid: str, panel_uuid: str) -> dict | None:
+        return self.panels_by_uuid.get((dashboard_uuid, panel_uuid))
+
+
+def plan_dashboard_template(dashboard: dict, old_template: dict | None) -> dict:
+    """
+    Compare a dashboard with the existing one of the same name, without calling AxonOps.
+    The plan has `changed`, `diff` and the `dashboard` to send when it is present.
+    """
+    if old_template:
+        old_data = {
+            'present': True,
+            'name': old_template['name'],
+            'filters': old_template['filters'],
+            'panels': old_template['panels'],
+        }
+    else:
+        old_data = {
+            'present': False,
+        }
+
+    if dashboard['present']:
+        new_data = {
+            'present': True,
+            'name': dashboard['name'],
+            'filters': dashboard['filters'],
+            'panels': dashboard['panels'],
+        }
+    else:
+        new_data = {
+            'present': False,
+        }
+
+    changed = dicts_are_different(new_data, old_data)
+    return {
+        'changed': changed,
+        'diff': {'before': old_data, 'after': new_data},
+        'dashboard': new_data if dashboard['present'] else None,
+    }
+
+
+def dashboard_templates_payload(old_templates: dict, plans: list, cluster_type: str) -> dict:
+    """
+    The dashboard templates to PUT back, in the order of the server. A changed dashboard takes the position
+    of the existing one of its name, new dashboards are added at the end and removed ones are dropped.
+    `plans` is a list of (name, plan), the dashboards that didn't change are kept as they are.
+    """
+    changed_plans = {name: plan for name, plan in plans if plan['changed']}
+    old_dashboards = old_templates.get('dashboards') or []
+
+    # the position of the last dashboard of a name, where the changed one is put
+    positions = {old_template['name']: i for i, old_template in enumerate(old_dashboards) if 'name' in old_template}
+
+    dashboards_to_send = []
+    for i, old_template in enumerate(old_dashboards):
+        plan = changed_plans.get(old_template.get('name'))
+        if plan is None:
+            dashboards_to_send.append(old_template)
+        elif positions[old_template['name']] == i and plan['dashboard'] is not None:
+            dashboards_to_send.append(plan['dashboard'])
+
+    for name, plan in changed_plans.items():
+        if name not in positions and plan['dashboard'] is not None:
+            dashboards_to_send.append(plan['dashboard'])
+
+    return {
+        'type': cluster_type,
+        'dashboards': dashboards_to_send
+    }
@@ -0,0 +1,408 @@
+import email.utils
+import http.client
+import os
+import random
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_cache import cache_dir, cache_key, \
+    locked_file, read_json_file, remove_file, write_json_file
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_POOL_IDLE_TIMEOUT = 30.0
+DEFAULT_TIMEOUT = 10
+
+# errors raised when a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, BrokenPipeError,
+                           ConnectionResetError, ConnectionAbortedError)
+
+# the response body is read and decompressed in chunks of this size
+READ_CHUNK_SIZE = 64 * 1024
+
+ACCEPT_ENCODING = 'gzip, deflate'
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+# the credentials are not sent to another scheme, host or port when following a redirect
+CREDENTIAL_HEADERS = ('authorization', 'cookie', 'proxy-authorization')
+
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+# a longer Retry-After is shortened to this, a task should not hang for minutes
+RETRY_AFTER_MAX = 60.0
+
+# transient answers, the request can be sent again
+RETRY_STATUSES = (429, 502, 503, 504)
+# transient failures before getting an answer
+RETRY_ERRORS = (ConnectionError, TimeoutError, http.client.HTTPException, urllib.error.URLError)
+# failures to reach the server, they are counted by the circuit breaker. An unknown host name or a TLS error
+# is not retried but it is the same misconfigured or unreachable endpoint
+CIRCUIT_BREAKER_ERRORS = (ConnectionError, TimeoutError, urllib.error.URLError, socket.gaierror, ssl.SSLError)
+# methods that can always be retried, the others only when the caller says the endpoint is idempotent
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_RESET = 30.0
+
+
+def origin(url: str) -> tuple:
+    """
+    the (scheme, host, port) of the url
+    """
+    parsed = urllib.parse.urlsplit(url)
+    scheme = parsed.scheme.lower()
+    return scheme, (parsed.hostname or '').lower(), parsed.port or (443 if scheme == 'https' else 80)
+
+
+def parse_retry_after(value: str) -> float | None:
+    """
+    read a Retry-After header, it can be a number of seconds or an HTTP date
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before sending a request again: exponential backoff with full jitter,
+    or what the server asks for with Retry-After
+    """
+
+    def __init__(self, max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS, base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 jitter: bool = True):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.jitter = jitter
+
+    def can_retry(self, method: str, idempotent: bool, attempt: int) -> bool:
+        """
+        check if the request that failed on `attempt` (starting from 1) can be sent again
+        """
+        if attempt >= self.max_attempts:
+            return False
+        return idempotent or method.upper() in SAFE_METHODS
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        """
+        seconds to wait after the failed `attempt`
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, RETRY_AFTER_MAX)
+
+        delay = min(RETRY_MAX_DELAY, self.base_delay * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+class BodyDecoder:
+    """
+    Incremental decompression of a gzip or deflate response body
+    """
+
+    def __init__(self, content_encoding: str):
+        self.content_encoding = (content_encoding or '').strip().lower()
+        self._decompressor = None
+        if self.content_encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decode(self, chunk: bytes) -> bytes:
+        if self.content_encoding == 'deflate' and self._decompressor is None:
+            # deflate should be zlib-wrapped, but some servers send the raw stream
+            zlib_wrapped = len(chunk) > 1 and chunk[0] & 0x0f == 8 and (chunk[0] * 256 + chunk[1]) % 31 == 0
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS if zlib_wrapped else -zlib.MAX_WBITS)
+        if self._decompressor is None:
+            return chunk
+        return self._decompressor.decompress(chunk)
+
+    def flush(self) -> bytes:
+        if self._decompressor is None:
+            return b''
+        return self._decompressor.flush()
+
+
+def read_body(res: http.client.HTTPResponse) -> bytearray:
+    """
+    Read the response in chunks, decompressing them as they arrive, so the compressed body is never held in memory
+    """
+    decoder = BodyDecoder(res.headers.get('Content-Encoding'))
+    body = bytearray()
+    while True:
+        chunk = res.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        body += decoder.decode(chunk)
+    body += decoder.flush()
+    return body
+
+
+class PooledResponse:
+    """
+    The parts of an HTTP response that the AxonOps client needs, the body is already read
+    """
+
+    def __init__(self, status: int, headers: http.client.HTTPMessage, body: bytearray):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections, reused per host by every request of the process
+    """
+
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE, idle_timeout: float = DEFAULT_POOL_IDLE_TIMEOUT):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl.create_default_context()
+        # idle connections by (scheme, host, port), each entry is (connection, last used)
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def configure(self, max_size: int, idle_timeout: float):
+        """
+        change the size and the idle timeout, used when the pool is shared
+        """
+        with self._lock:
+            self.max_size = max_size
+            self.idle_timeout = idle_timeout
+
+    def _new_connection(self, key: tuple, timeout: float):
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _get(self, key: tuple, timeout: float):
+        """
+        get an idle connection for the host if there is a fresh one, otherwise a new connection
+        """
+        now = time.monotonic()
+        with self._lock:
+            connections = self._idle.get(key, [])
+            while connections:
+                conn, last_used = connections.pop()
+                if now - last_used <= self.idle_timeout:
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return self._new_connection(key, timeout), False
+
+    def _put(self, key: tuple, conn):
+        """
+        give back a connection to the pool, it will be closed if the pool is full
+        """
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_size:
+                connections.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        """
+        close all the idle connections
+        """
+        with self._lock:
+            for connections in self._idle.values():
+                for conn, _ in connections:
+                    conn.close()
+            self._idle = {}
+
+    def request(self, method: str, url: str, headers: dict = None, body: bytes = None,
+                timeout: float = DEFAULT_TIMEOUT, idempotent: bool = False) -> PooledResponse:
+        """
+        Perform a request on a pooled connection and read the full response.
+        Redirects are followed for GET and HEAD like open_url does, without the credentials when the redirect
+        goes to another scheme, host or port.
+        A request that fails on a kept-alive connection closed by the server is sent again on a new connection
+        only for the safe methods or when the caller says it is `idempotent`.
+        gzip and deflate are negotiated unless the caller sets Accept-Encoding.
+        """
+        headers = dict(headers or {})
+        if not any(name.lower() == 'accept-encoding' for name in headers):
+            headers['Accept-Encoding'] = ACCEPT_ENCODING
+        resend_stale = idempotent or method.upper() in SAFE_METHODS
+
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request_once(method, url, headers, body, timeout, resend_stale)
+            location = response.headers.get('Location')
+            if response.status not in REDIRECT_CODES or not location or method.upper() not in ('GET', 'HEAD'):
+                return response
+            next_url = urllib.parse.urljoin(url, location)
+            if origin(next_url) != origin(url):
+                headers = {name: value for name, value in headers.items() if name.lower() not in CREDENTIAL_HEADERS}
+            url = next_url
+        return response
+
+    def _request_once(self, method: str, url: str, headers: dict, body: bytes, timeout: float,
+                      resend_stale: bool) -> PooledResponse:
+        parsed = urllib.parse.urlsplit(url)
+        key = origin(url)
+        path = urllib.parse.urlunsplit(('', '', parsed.path or '/', parsed.query, ''))
+
+        while True:
+            conn, reused = self._get(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                res = conn.getresponse()
+                content = read_body(res)
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                # the server dropped the idle connection, try again on a new one. The server may have
+                # processed the request already, so it is not sent twice unless that is harmless
+                if reused and resend_stale:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if res.will_close:
+                conn.close()
+            else:
+                self._put(key, conn)
+            return PooledResponse(res.status, res.headers, content)
+
+
+class RateLimiter:
+    """
+    Token bucket shared through a file by all the processes sending requests to the same base url.
+    Every request takes a token, when the bucket is empty it reserves the next one and waits for it.
+    """
+
+    def __init__(self, base_url: str, rate: float, burst: int = 0, directory: str = ''):
+        self.rate = rate
+        self.burst = max(1, burst or int(rate))
+        self.path = os.path.join(directory or cache_dir(), 'ratelimit-' + cache_key(base_url) + '.json')
+
+    def acquire(self) -> float:
+        """
+        take a token, return the seconds waited for it
+        """
+        with locked_file(self.path):
+            state = read_json_file(self.path) or {}
+            now = time.time()
+            elapsed = max(0.0, now - state.get('updated', now))
+            tokens = min(float(self.burst), state.get('tokens', float(self.burst)) + elapsed * self.rate) - 1
+            write_json_file(self.path, {'tokens': tokens, 'updated': now})
+
+        # a negative bucket means the token is reserved in the future
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def is_connection_failure(error: Exception) -> bool:
+    """
+    the error is a failure to reach the server, not an invalid answer from it
+    """
+    return isinstance(error, CIRCUIT_BREAKER_ERRORS) and not isinstance(error, http.client.HTTPException)
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to a base url after `threshold` consecutive requests failed to connect, from any process.
+    A request counts once, when its retries are exhausted.
+    After `reset` seconds one request is let through as a probe, its success closes the circuit again.
+    """
+
+    def __init__(self, base_url: str, threshold: int = DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+                 reset: float = DEFAULT_CIRCUIT_BREAKER_RESET, directory: str = ''):
+        self.base_url = base_url
+        self.threshold = threshold
+        self.reset = reset
+        self.path = os.path.join(directory or cache_dir(), 'circuit-' + cache_key(base_url) + '.json')
+
+    def allow(self):
+        """
+        raise CircuitOpenError if the circuit is open, or half-open with another probe running
+        """
+        state = read_json_file(self.path) or {}
+        if state.get('failures', 0) < self.threshold:
+            return
+
+        with locked_file(self.path):
+            state = read_json_file(self.path) or {}
+            failures = state.get('failures', 0)
+            if failures < self.threshold:
+                return
+
+            now = time.time()
+            # the last failure or probe is recent, don't even try
+            wait = max(state.get('opened', 0), state.get('probe', 0)) + self.reset - now
+            if wait > 0:
+                raise CircuitOpenError(f"AxonOps at {self.base_url} is unreachable, {failures} consecutive connection "
+                                       f"failures, not trying again for {wait:.0f}s")
+
+            # half-open, this request is the probe
+            state['probe'] = now
+            write_json_file(self.path, state)
+
+    def success(self):
+        state = read_json_file(self.path) or {}
+        if not state.get('failures'):
+            return
+        with locked_file(self.path):
+            remove_file(self.path)
+
+    def failure(self):
+        with locked_file(self.path):
+            state = read_json_file(self.path) or {}
+            state['failures'] = state.get('failures', 0) + 1
+            if state['failures'] >= self.threshold:
+                state['opened'] = time.time()
+            write_json_file(self.path, state)
+
+
+def uses_proxy(url: str) -> bool:
+    """
+    check if the environment configures a proxy for the url, pooled connections don't go through proxies
+    """
+    parsed = urllib.parse.urlsplit(url)
+    proxies = urllib.request.getproxies()
+    if parsed.scheme.lower() not in proxies:
+        return False
+    return not urllib.request.proxy_bypass(parsed.hostname or '')
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool(max_size: int = DEFAULT_POOL_SIZE,
+                        idle_timeout: float = DEFAULT_POOL_IDLE_TIMEOUT) -> ConnectionPool:
+    """
+    get the connection pool shared by all the AxonOps clients of the process
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(max_size, idle_timeout)
+        else:
+            _pool.configure(max_size, idle_timeout)
+        return _pool
@@ -0,0 +1,63 @@
+class IntegrationRegistry:
+    """
+    The integrations output of a cluster with its definitions indexed by (Type, name), by name and by ID.
+    The first definition wins. The registry is updated in place after the integrations are written,
+    so the lookups that follow see them without reading the integrations again.
+    """
+
+    def __init__(self, integrations: dict):
+        self.integrations = integrations or {}
+        self._index()
+
+    def _index(self):
+        self.by_type_and_name = {}
+        self.by_name = {}
+        self.by_id = {}
+        for definition in self.integrations.get('Definitions') or []:
+            self._add_to_index(definition)
+
+    def _add_to_index(self, definition: dict):
+        params = definition.get('Params') or {}
+        if 'name' in params:
+            if 'Type' in definition:
+                self.by_type_and_name.setdefault((definition['Type'], params['name']), definition)
+            self.by_name.setdefault(params['name'], definition)
+        if 'ID' in definition:
+            self.by_id.setdefault(definition['ID'], definition)
+
+    def find_by_name_and_type(self, integration_type: str, name: str) -> dict | None:
+        return self.by_type_and_name.get((integration_type, name))
+
+    def find_id_by_name(self, name: str) -> str | None:
+        definition = self.by_name.get(name)
+        return definition.get('ID') if definition else None
+
+    def find_name_by_id(self, integration_id: str) -> str | None:
+        definition = self.by_id.get(integration_id)
+        return (definition.get('Params') or {}).get('name') if definition else None
+
+    def put(self, definition: dict):
+        """
+        add a definition at the end, or replace the one with the same ID where it is
+        """
+        definitions = self.integrations.get('Definitions') or []
+        self.integrations['Definitions'] = definitions
+
+        existing = self.by_id.get(definition['ID'])
+        if existing is None:
+            definitions.append(definition)
+            self._add_to_index(definition)
+            return
+
+        # the name or the type can change, the indexes are built again
+        definitions[definitions.index(existing)] = {**existing, **definition}
+        self._index()
+
+    def remove(self, integration_id: str):
+        """
+        remove the definition with the ID
+        """
+        definitions = self.integrations.get('Definitions') or []
+        self.integrations['Definitions'] = [definition for definition in definitions
+                                            if definition.get('ID') != integration_id]
+        self._index()
@@ -0,0 +1,169 @@
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different
+
+# the options of each type of integration, they are the module arguments of the <type>_integration modules
+# and the items of the lists of integrations
+SLACK_INTEGRATION_OPTIONS = {
+    'name': {'type': 'str', 'required': True},
+    'webhook_url': {'type': 'str'},
+    'channel': {'type': 'str', 'required': False, 'default': ''},
+    'present': {'type': 'bool', 'default': True},
+    'axonops_url': {'type': 'str', 'required': False, 'default': ''},
+}
+
+PAGERDUTY_INTEGRATION_OPTIONS = {
+    'name': {'type': 'str', 'required': True},
+    'integration_key': {'type': 'str'},
+    'present': {'type': 'bool', 'default': True},
+}
+
+OPSGENIE_INTEGRATION_OPTIONS = {
+    'name': {'type': 'str', 'required': True},
+    'opsgenie_key': {'type': 'str'},
+    'present': {'type': 'bool', 'default': True},
+}
+
+SERVICENOW_INTEGRATION_OPTIONS = {
+    'name': {'type': 'str', 'required': True},
+    'instance_name': {'type': 'str'},
+    'user': {'type': 'str'},
+    'password': {'type': 'str'},
+    'present': {'type': 'bool', 'default': True},
+}
+
+TEAMS_INTEGRATION_OPTIONS = {
+    'name': {'type': 'str', 'required': True},
+    'webhook_url': {'type': 'str'},
+    'present': {'type': 'bool', 'default': True},
+}
+
+# for each kind of integration: the Type in AxonOps, the options with the ones required when present,
+# and the name of the Params in AxonOps of each option
+INTEGRATION_TYPES = {
+    'slack': {
+        'type': 'slack',
+        'options': SLACK_INTEGRATION_OPTIONS,
+        'required_if': [('present', True, ('webhook_url',))],
+        'params': {'webhook_url': 'url', 'channel': 'channel', 'axonops_url': 'axondashUrl'},
+    },
+    'pagerduty': {
+        'type': 'pagerduty',
+        'options': PAGERDUTY_INTEGRATION_OPTIONS,
+        'required_if': [('present', True, ('integration_key',))],
+        'params': {'integration_key': 'integration_key'},
+    },
+    'opsgenie': {
+        'type': 'opsgenie',
+        'options': OPSGENIE_INTEGRATION_OPTIONS,
+        'required_if': [('present', True, ('opsgenie_key',))],
+        'params': {'opsgenie_key': 'opsgenie_key'},
+    },
+    'servicenow': {
+        'type': 'servicenow',
+        'options': SERVICENOW_INTEGRATION_OPTIONS,
+        'required_if': [('present', True, ('instance_name', 'user', 'password'))],
+        'params': {'instance_name': 'instance_name', 'user': 'user', 'password': 'password'},
+    },
+    'teams': {
+        'type': 'microsoft_teams',
+        'options': TEAMS_INTEGRATION_OPTIONS,
+        'required_if': [('present', True, ('webhook_url',))],
+        'params': {'webhook_url': 'webHookURL'},
+    },
+}
+
+
+def plan_integration(axonops: AxonOps, kind: str, integration: dict, found_definition: dict | None) -> dict:
+    """
+    Compare an integration with the existing definition of the same type and name, without calling AxonOps.
+    The plan has `changed` and `diff`, and `action` is 'post' with the `payload` or 'delete' with the
+    `integration_id` when the integration must be changed.
+    """
+    integration_type = INTEGRATION_TYPES[kind]
+    params = integration_type['params']
+
+    existing_id = found_definition['ID'] if found_definition and 'ID' in found_definition else None
+
+    if existing_id:
+        old_data = {
+            'name': found_definition['Params']['name'],
+            **{field: found_definition['Params'].get(param, '') for field, param in params.items()},
+            'present': True,
+        }
+    else:
+        old_data = {'present': False}
+
+    if integration['present']:
+        new_data = {
+            'name': integration['name'],
+            **{field: integration[field] for field in params},
+            'present': True,
+        }
+        # slack links to the AxonOps dashboard, the one of the client when it is not set
+        if 'axonops_url' in new_data and new_data['axonops_url'] == '':
+            new_data['axonops_url'] = axonops.dash_url()
+    else:
+        new_data = {
+            'name': '',
+            **{field: '' for field in params},
+            'present': False,
+        }
+
+    # Work out what changes are required and make the diff
+    if not integration['present'] and not existing_id:
+        changed = False
+    else:
+        changed = dicts_are_different(new_data, old_data)
+
+    plan = {
+        'changed': changed,
+        'action': None,
+        'diff': {'before': old_data, 'after': new_data},
+    }
+    if not changed:
+        return plan
+
+    # Delete the existing integration
+    if existing_id and not integration['present']:
+        plan['action'] = 'delete'
+        plan['integration_id'] = existing_id
+        return plan
+
+    # Add or update the integration
+    plan['action'] = 'post'
+    plan['payload'] = {
+        'type': integration_type['type'],
+        'params': {
+            'name': new_data['name'],
+            **{param: new_data[field] for field, param in params.items()},
+        }
+    }
+    if existing_id:
+        plan['payload']['id'] = existing_id
+    return plan
+
+
+def record_integration(axonops: AxonOps, cluster: str, plan: dict):
+    """
+    update the integration registry of the cluster after the plan was applied
+    """
+    registry = axonops.integration_registries.get(cluster)
+    if registry is None:
+        return
+
+    if plan['action'] == 'delete':
+        registry.remove(plan['integration_id'])
+    elif 'id' in plan['payload']:
+        registry.put({'ID': plan['payload']['id'], 'Type': plan['payload']['type'], 'Params': plan['payload']['params']})
+    else:
+        # the ID of a new integration is given by AxonOps
+        axonops.forget_integrations(cluster)
+
+
+def integration_request(axonops: AxonOps, cluster: str, plan: dict) -> dict:
+    """
+    the do_request arguments that apply the plan
+    """
+    if plan['action'] == 'delete':
+        return {'rel_url': axonops.integrations_url(cluster) + "/" + plan['integration_id'], 'method': 'DELETE'}
+    return {'rel_url': axonops.integrations_url(cluster), 'method': 'POST', 'json_data': plan['payload']}
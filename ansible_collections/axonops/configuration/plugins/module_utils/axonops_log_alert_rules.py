@@ -0,0 +1,239 @@
+import re
+import uuid
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different, \
+    normalize_numbers
+
+# the options of a log alert rule, they are the module arguments of log_alert_rule and the items of log_alert_rules
+LOG_ALERT_RULE_OPTIONS = {
+    'name': {'type': 'str', 'required': True},
+    'content': {'type': 'str', 'default': ''},
+    'description': {'type': 'str', 'default': ''},
+    'warning_value': {'type': 'int'},
+    'critical_value': {'type': 'int'},
+    'duration': {'type': 'str'},
+    'present': {'type': 'bool', 'default': True},
+    'operator': {'type': 'str', 'choices': ['=', '>=', '>', '<=', '<', '!='], 'default': '>='},
+    'level': {'type': 'str', 'default': ''},
+    'type': {'type': 'str', 'default': ''},
+    'source': {'type': 'str', 'default': ''},
+    'dc': {'type': 'list', 'default': []},
+    'rack': {'type': 'list', 'default': []},
+    'host_id': {'type': 'list', 'default': []},
+    'routing': {'type': 'dict', 'default': {}}
+}
+
+LEVEL_CHOICES = ['debug', 'error', 'warning', 'info']
+
+EVENTS_PATTERN = r'events\{(.+)\}'
+EVENTS_ELEMENT_PATTERN = r'(\w+)="((?:[^"\\]|\\.)*?)"'
+
+
+def alerts_url(axonops: AxonOps, cluster: str) -> str:
+    return f"/api/v1/alert-rules/{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}"
+
+
+def check_log_alert_rule(rule: dict) -> str | None:
+    """
+    check the rule arguments, return an error if they are not valid
+    """
+    # check if level is correct or empty
+    for level in rule['level'].split(',') or []:
+        if level not in LEVEL_CHOICES and level:
+            return f'{level} is not a valid level, accepted: {LEVEL_CHOICES}'
+    return None
+
+
+def fetch_log_alert_rules_state(axonops: AxonOps, cluster: str, with_integrations: bool):
+    """
+    Get the existing alerts, and the integrations at the same time when they are needed for the routing.
+    Return the existing log alerts indexed by name or an error.
+    """
+    state_urls = [alerts_url(axonops, cluster)]
+    if with_integrations:
+        state_urls.append(axonops.integrations_url(cluster))
+    responses = axonops.do_requests(state_urls)
+
+    existing_alerts, error = responses[0]
+    if error is not None:
+        return None, error
+
+    if with_integrations and responses[1][1] is None:
+        axonops.set_integration_output(cluster, responses[1][0])
+
+    return index_log_alerts(existing_alerts), None
+
+
+def index_log_alerts(existing_alerts: dict) -> dict:
+    """
+    Parse the events expressions of the existing alerts once. Every name has the `alert`, and its `old_data`
+    to compare with a rule or the `error` if the expression can't be read. The last alert of a name wins.
+    """
+    index = {}
+    for alert in (existing_alerts or {}).get('metricrules') or []:
+        if 'events' not in alert['expr']:
+            continue
+
+        match = re.search(EVENTS_PATTERN, alert['expr'])
+        if not match:
+            index[alert['alert']] = {'alert': alert, 'error': r'pattern not found for expr ' + alert['expr']}
+            continue
+
+        old_alert_expr = {}
+        for key, value in re.findall(EVENTS_ELEMENT_PATTERN, match.group(1)):
+            old_alert_expr[key] = value.replace('|', ',')
+
+        # clean the integrations, on a copy as the alert is in the shared state
+        old_integrations = alert.get('integrations', {})
+        if old_integrations:
+            old_integrations = dict(old_integrations)
+            del old_integrations['Type']
+            del old_integrations['OverrideError']
+            del old_integrations['OverrideInfo']
+            del old_integrations['OverrideWarning']
+            old_integrations['Routing'] = [{k: v for k, v in route_item.items() if k != 'Params'}
+                                           for route_item in old_integrations['Routing']]
+
+        index[alert['alert']] = {
+            'alert': alert,
+            'error': None,
+            'old_data': {
+                'name': alert['alert'],
+                'description': alert['annotations']['description'],
+                'operator': alert['operator'],
+                'warning_value': alert['warningValue'],
+                'critical_value': alert['criticalValue'],
+                'duration': alert['for'],
+                'content': old_alert_expr['message'] if 'message' in old_alert_expr else '',
+                'level': old_alert_expr['level'] if 'level' in old_alert_expr else '',
+                'type': old_alert_expr['type'] if 'type' in old_alert_expr else '',
+                'source': old_alert_expr['source'] if 'source' in old_alert_expr else '',
+                'present': True,
+                'integrations': old_integrations,
+            },
+        }
+    return index
+
+
+def plan_log_alert_rule(axonops: AxonOps, rule: dict, cluster: str, index: dict):
+    """
+    Compare a log alert rule with the indexed existing alerts, without calling AxonOps.
+    Return the plan or an error. The plan has `changed` and `diff`, and `action` is
+    'post' with the `payload` or 'delete' with the `alert_id` when the rule must be changed.
+    """
+    plan = {
+        'changed': False,
+        'action': None,
+    }
+
+    existing = index.get(rule['name'])
+
+    # Nothing to do if the alert doesn't exist and we don't want it to
+    if not existing and not rule['present']:
+        return plan, None
+
+    if existing:
+        if existing['error'] is not None:
+            return None, existing['error']
+        old_alert = existing['alert']
+        old_data = existing['old_data']
+    else:
+        old_alert = None
+        old_data = {'present': False}
+
+    old_data_normalized = normalize_numbers(old_data)
+
+    # create the new alert
+    if rule['present']:
+        new_data = {
+            'name': rule['name'],
+            'description': rule['description'],
+            'operator': rule['operator'],
+            'warning_value': rule['warning_value'],
+            'critical_value': rule['critical_value'],
+            'duration': rule['duration'],
+            'content': rule['content'],
+            'level': rule['level'],
+            'type': rule['type'],
+            'source': rule['source'],
+            'present': True,
+            'integrations': {}
+        }
+    else:
+        new_data = {
+            'name': rule['name'],
+            'present': False,
+        }
+
+    # create routing override list
+    routing = []  # format [{id: 'id33s', severity: 'error'},...]
+    for severity in rule['routing']:
+        if severity not in {"error", "warning", "info"}:
+            return None, f'{severity} is not a valid level, accepted: info, warn, error'
+        for override in rule['routing'][severity]:
+            integration_id, error = axonops.find_integration_id_by_name(cluster, override)
+            if error is not None:
+                return None, error
+            if integration_id is None:
+                return None, f"Integration name {override} not configured in AxonOps integrations."
+            routing.append({
+                'ID': integration_id,
+                'Severity': severity,
+            })
+    if routing:
+        new_data['integrations']['Routing'] = routing
+    elif 'integrations' in new_data:
+        new_data['integrations']['Routing'] = []
+
+    new_data_normalized = normalize_numbers(new_data)
+
+    changed = dicts_are_different(new_data_normalized, old_data_normalized)
+    plan['changed'] = changed
+    plan['diff'] = {'before': old_data, 'after': new_data}
+
+    if not changed:
+        return plan, None
+
+    # Delete the alert rule, if present is False
+    if not rule['present']:
+        plan['action'] = 'delete'
+        plan['alert_id'] = old_alert["id"]
+        return plan, None
+
+    # create the event string for expr
+    events_string = "events{{{message_str}{level_str}{source_str}{type_str}}}".format(
+        message_str=",message=\"{}\"".format(rule['content']) if rule['content'] else '',
+        level_str=",level=\"{}\"".format(rule['level'].replace(',', '|')) if rule['level'] else '',
+        source_str=",source=\"{}\"".format(
+            rule['source'].replace(',', '|')) if rule['source'] else '',
+        type_str=",type=\"{}\"".format(rule['type'].replace(',', '|')) if rule['type'] else ''
+    ).replace('{,', '{')
+
+    # Create or update the alert rule
+    plan['action'] = 'post'
+    plan['payload'] = {
+        'alert': rule['name'],
+        'for': rule['duration'],
+        'operator': rule['operator'],
+        'warningValue': rule['warning_value'],
+        'criticalValue': rule['critical_value'],
+        'annotations': {
+            'description': rule['description'],
+            'summary': "%s is %s than %s (current value: {{$value}}" % (
+                rule['name'], rule['operator'], rule['warning_value']),
+        },
+        'integrations': new_data['integrations'],
+        'expr': events_string,
+        'id': old_alert["id"] if old_alert else str(uuid.uuid4()),
+    }
+    return plan, None
+
+
+def log_alert_rule_request(axonops: AxonOps, cluster: str, plan: dict) -> dict:
+    """
+    the do_request arguments that apply the plan
+    """
+    if plan['action'] == 'delete':
+        return {'rel_url': alerts_url(axonops, cluster) + '/' + plan['alert_id'], 'method': 'DELETE'}
+    return {'rel_url': alerts_url(axonops, cluster), 'method': 'POST', 'json_data': plan['payload']}
@@ -0,0 +1,92 @@
+import uuid
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different
+
+# the options of a logcollector, they are the module arguments of logcollector and the items of logcollectors
+LOGCOLLECTOR_OPTIONS = {
+    'present': {'type': 'bool', 'required': False, 'default': True},
+    'name': {'type': 'str', 'required': True},
+    'interval': {'type': 'str', 'required': False, 'default': '5s'},
+    'timeout': {'type': 'str', 'required': False, 'default': '1m'},
+    'filename': {'type': 'str', 'required': True},
+    'dateFormat': {'type': 'str', 'required': False, 'default': 'yyyy-MM-dd HH:mm:ss,SSS'},
+    'infoRegex': {'type': 'str', 'required': False, 'default': ''},
+    'warningRegex': {'type': 'str', 'required': False, 'default': ''},
+    'errorRegex': {'type': 'str', 'required': False, 'default': ''},
+    'debugRegex': {'type': 'str', 'required': False, 'default': ''},
+    'readonly': {'type': 'bool', 'required': False, 'default': False}
+}
+
+LOGCOLLECTOR_FIELDS = ['name', 'interval', 'timeout', 'filename', 'dateFormat', 'infoRegex', 'warningRegex',
+                       'errorRegex', 'debugRegex', 'readonly']
+
+
+def logcollectors_url(axonops: AxonOps, cluster: str) -> str:
+    return f"/api/v1/logcollectors/{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}"
+
+
+def index_logcollectors(logcollectors: list | None) -> dict:
+    """
+    the existing logcollectors by filename, the file is used to identify the collector. The last one wins.
+    """
+    return {logcollector['filename']: logcollector for logcollector in logcollectors or []}
+
+
+def plan_logcollector(logcollector: dict, existing_logcollector: dict | None) -> dict:
+    """
+    Compare a logcollector with the existing one of the same file, without calling AxonOps.
+    The plan has `changed`, `diff` and the `logcollector` to send, its uuid is kept when it exists.
+    """
+    # the logcollector that we are working on, default empty
+    current_logcollector = {}
+    if existing_logcollector:
+        current_logcollector = {
+            'uuid': existing_logcollector['uuid'],
+            'present': True,
+            **{field: existing_logcollector[field] for field in LOGCOLLECTOR_FIELDS},
+        }
+
+    if logcollector['present']:
+        requested_logcollector = {
+            'uuid': current_logcollector['uuid'] if current_logcollector else str(uuid.uuid4()),
+            'present': True,
+            **{field: logcollector[field] for field in LOGCOLLECTOR_FIELDS},
+        }
+    else:
+        requested_logcollector = {}
+
+    changed = dicts_are_different(current_logcollector, requested_logcollector)
+    return {
+        'changed': changed,
+        'diff': {'before': current_logcollector, 'after': requested_logcollector},
+        'logcollector': requested_logcollector,
+    }
+
+
+def logcollectors_payload(logcollectors: list | None, plans: list) -> list:
+    """
+    The logcollectors to PUT back: the existing ones with the changed logcollectors of `plans` replaced or removed.
+    `plans` is a list of (filename, plan), the logcollectors that didn't change are kept as they are.
+    """
+    payload = list(logcollectors or [])
+
+    for filename, plan in plans:
+        if not plan['changed']:
+            continue
+        payload = [logcollector for logcollector in payload if logcollector['filename'] != filename]
+
+        if plan['logcollector']:
+            # add the mandatory fields to the requested logcollector
+            requested_logcollector = {key: value for key, value in plan['logcollector'].items() if key != 'present'}
+            requested_logcollector['id'] = ''
+            requested_logcollector['integrations'] = {
+                "OverrideError": False,
+                "OverrideInfo": False,
+                "OverrideWarning": False,
+                "Routing": None,
+                "Type": ""
+            }
+            payload.append(requested_logcollector)
+
+    return payload
@@ -0,0 +1,154 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps, make_axonops
+
+
+class AxonOpsRunner:
+    """
+    The reconcile loop of the modules, shared by AxonOpsModule and the action plugins.
+    The class has `params`, `get_axonops`, `exit_json` and `fail_json`.
+    """
+
+    # set at class level, fail_json can be called by the argument validation in AnsibleModule.__init__
+    axonops = None
+
+    def _add_stats(self, kwargs: dict) -> dict:
+        if self.axonops is not None:
+            kwargs['axonops_stats'] = self.axonops.stats()
+        return kwargs
+
+    def run(self, reconcile: Callable, fan_out: bool = True):
+        """
+        Create the AxonOps client and call reconcile(module, axonops), it exits the module.
+        With `clusters` and `fan_out`, reconcile is called for each cluster at the same time and the results are
+        returned by cluster.
+        """
+        axonops = self.get_axonops()
+        if axonops.errors:
+            self.fail_json(msg=' '.join(axonops.errors), changed=False)
+
+        if not fan_out or not self.params.get('clusters'):
+            reconcile(self, axonops)
+            return
+
+        clusters, error = resolve_clusters(axonops, self.params['clusters'])
+        if error is not None:
+            self.fail_json(msg=error, changed=False)
+
+        results = run_for_clusters(self, axonops, reconcile, clusters, self.params['cluster_workers'])
+        self.exit_clusters(results)
+
+    def exit_clusters(self, results: dict):
+        """
+        exit with the results by cluster, the module fails if one of the clusters failed
+        """
+        result = {
+            'changed': any(cluster_result.get('changed') for cluster_result in results.values()),
+            'clusters': results,
+        }
+
+        diffs = []
+        for cluster, cluster_result in results.items():
+            cluster_diffs = cluster_result.get('diff') or []
+            for diff in cluster_diffs if isinstance(cluster_diffs, list) else [cluster_diffs]:
+                headers = {header: f"{cluster}: {diff[header]}" if diff.get(header) else cluster
+                           for header in ['before_header', 'after_header']}
+                diffs.append({**diff, **headers})
+        if diffs:
+            result['diff'] = diffs
+
+        failed = [f"{cluster}: {cluster_result.get('msg')}" for cluster, cluster_result in results.items()
+                  if cluster_result.get('failed')]
+        if failed:
+            self.fail_json(msg="Failed on clusters: " + '; '.join(failed), **result)
+        self.exit_json(**result)
+
+
+class AxonOpsModule(AxonOpsRunner, AnsibleModule):
+    """
+    AnsibleModule that creates the AxonOps client and adds its statistics to the result as `axonops_stats`
+    """
+
+    def get_axonops(self) -> AxonOps:
+        """
+        create the AxonOps client from the module parameters
+        """
+        self.axonops = make_axonops(self.params)
+        return self.axonops
+
+    def exit_json(self, **kwargs):
+        super().exit_json(**self._add_stats(kwargs))
+
+    def fail_json(self, msg, **kwargs):
+        super().fail_json(msg, **self._add_stats(kwargs))
+
+
+class ModuleExit(Exception):
+    """
+    raised instead of exiting the process, with the result
+    """
+
+    def __init__(self, result: dict):
+        super().__init__(result.get('msg', ''))
+        self.result = result
+
+
+class ClusterModule:
+    """
+    The module seen by the reconcile of one cluster: `params` has the cluster and exit_json and fail_json
+    return the result of the cluster instead of exiting. Everything else is the module.
+    """
+
+    def __init__(self, module: AxonOpsRunner, cluster: str):
+        self.module = module
+        # the params are copied, reconcile is allowed to change them
+        self.params = {**copy.deepcopy(module.params), 'cluster': cluster, 'clusters': None}
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+    def exit_json(self, **kwargs):
+        raise ModuleExit(kwargs)
+
+    def fail_json(self, msg, **kwargs):
+        raise ModuleExit({**kwargs, 'failed': True, 'msg': msg})
+
+
+def resolve_clusters(axonops: AxonOps, clusters: list):
+    """
+    the cluster names to reconcile, `all` is every cluster of the org with the cluster type of the client
+    """
+    if 'all' not in clusters:
+        # keep the order, without the repeated names
+        return list(dict.fromkeys(clusters)), None
+
+    clusters_by_type, error = axonops.get_clusters()
+    if error is not None:
+        return None, error
+    return clusters_by_type.get(axonops.get_cluster_type(), []), None
+
+
+def run_for_clusters(module: AxonOpsRunner, axonops: AxonOps, reconcile: Callable, clusters: list,
+                     max_workers: int) -> dict:
+    """
+    Call reconcile for each cluster on a bounded pool of threads sharing the AxonOps client,
+    and return the result of each cluster by name.
+    """
+    def run_cluster(cluster: str) -> dict:
+        try:
+            reconcile(ClusterModule(module, cluster), axonops)
+        except ModuleExit as cluster_exit:
+            return cluster_exit.result
+        except Exception as e:
+            return {'failed': True, 'msg': f"{type(e).__name__}: {e}"}
+        return {}
+
+    if not clusters:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(clusters)))) as executor:
+        return dict(zip(clusters, executor.map(run_cluster, clusters)))
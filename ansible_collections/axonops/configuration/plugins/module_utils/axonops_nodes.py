@@ -0,0 +1,42 @@
+import time
+
+# the nodes of a cluster are read again after this time
+DEFAULT_NODE_INDEX_TTL = 60.0
+
+
+class NodeIndex:
+    """
+    The nodes of a cluster by host_id, HostIP and human_readable_identifier. When a name matches several
+    nodes, the first node of the list returned by AxonOps wins.
+    """
+
+    def __init__(self, nodes: list, ttl: float = DEFAULT_NODE_INDEX_TTL):
+        self.built = time.monotonic()
+        self.ttl = ttl
+        self.nodes = {}
+        for node in nodes or []:
+            details = node.get('Details') or {}
+            for name in [node.get('host_id'), node.get('HostIP'), details.get('human_readable_identifier')]:
+                if name:
+                    self.nodes.setdefault(name, node)
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.built < self.ttl
+
+    def find(self, name: str) -> dict | None:
+        return self.nodes.get(name)
+
+    def resolve(self, names: list):
+        """
+        the host ids of the nodes given by their host id, IP or human readable identifier, in the order
+        of the names, and the names that are not nodes of the cluster
+        """
+        host_ids = []
+        unknown = []
+        for name in names or []:
+            node = self.nodes.get(name)
+            if node is None or not node.get('host_id'):
+                unknown.append(name)
+            else:
+                host_ids.append(node['host_id'])
+        return host_ids, unknown
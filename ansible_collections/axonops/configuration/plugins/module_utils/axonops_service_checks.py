@@ -0,0 +1,117 @@
+import uuid
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different
+
+# the options of each type of check, they are the module arguments of http_check, tcp_check and shell_check
+# and the items of the lists of service_checks
+HTTP_CHECK_OPTIONS = {
+    'present': {'type': 'bool', 'required': False, 'default': True},
+    'name': {'type': 'str', 'required': True},
+    'interval': {'type': 'str', 'required': True},
+    'http': {'type': 'str', 'required': True},
+    'timeout': {'type': 'str', 'required': True},
+    'method': {'type': 'str', 'required': False, 'default': 'GET', 'choices': ['GET', 'POST', 'PUT']},
+    'tls_skip_verify': {'type': 'bool', 'required': False, 'default': False},
+}
+
+TCP_CHECK_OPTIONS = {
+    'present': {'type': 'bool', 'required': False, 'default': True},
+    'name': {'type': 'str', 'required': True},
+    'interval': {'type': 'str', 'required': True},
+    'timeout': {'type': 'str', 'required': True},
+    'tcp': {'type': 'str', 'required': True},
+}
+
+SHELL_CHECK_OPTIONS = {
+    'present': {'type': 'bool', 'required': False, 'default': True},
+    'name': {'type': 'str', 'required': True},
+    'interval': {'type': 'str', 'required': True},
+    'timeout': {'type': 'str', 'required': True},
+    'shell': {'type': 'str', 'required': False, 'default': '/bin/bash'},
+    'script': {'type': 'str', 'required': True},
+}
+
+# the key of the checks in the healthchecks payload and the fields compared, for each type of check
+CHECK_TYPES = {
+    'http': {'key': 'httpchecks', 'fields': ['interval', 'name', 'http', 'method', 'timeout', 'tls_skip_verify']},
+    'tcp': {'key': 'tcpchecks', 'fields': ['interval', 'name', 'tcp', 'timeout']},
+    'shell': {'key': 'shellchecks', 'fields': ['interval', 'name', 'script', 'shell', 'timeout']},
+}
+
+
+def healthchecks_url(axonops: AxonOps, cluster: str) -> str:
+    return f"/api/v1/healthchecks/{axonops.org_name}/{axonops.get_cluster_type()}/{cluster}"
+
+
+def index_checks(checks: list | None) -> dict:
+    """
+    the existing checks of one type by name, the last one of a name wins
+    """
+    return {check['name']: check for check in checks or []}
+
+
+def plan_service_check(check_type: str, check: dict, existing_check: dict | None) -> dict:
+    """
+    Compare a check with the existing one of the same name, without calling AxonOps.
+    The plan has `changed`, `diff` and the `check` to send, its id is kept when it exists.
+    """
+    fields = CHECK_TYPES[check_type]['fields']
+
+    if check['present']:
+        new_check = {
+            'id': existing_check['id'] if existing_check else str(uuid.uuid4()),
+            'present': True,
+            **{field: check[field] for field in fields},
+        }
+    else:
+        new_check = {
+            'present': False
+        }
+
+    if existing_check:
+        existing_check_filtered = {
+            'id': existing_check['id'],
+            'present': True,
+            **{field: existing_check[field] for field in fields},
+        }
+    else:
+        existing_check_filtered = {
+            'present': False
+        }
+
+    changed = dicts_are_different(existing_check_filtered, new_check)
+    return {
+        'changed': changed,
+        'diff': {'before': existing_check_filtered, 'after': new_check},
+        'check': new_check,
+    }
+
+
+def healthchecks_payload(healthchecks: dict, plans: list) -> dict:
+    """
+    The healthchecks to PUT back: the existing ones with the changed checks of `plans` replaced or removed.
+    `plans` is a list of (check_type, name, plan), the checks that didn't change are kept as they are.
+    """
+    payload = {check_type['key']: healthchecks[check_type['key']] for check_type in CHECK_TYPES.values()}
+
+    for check_type, name, plan in plans:
+        if not plan['changed']:
+            continue
+        key = CHECK_TYPES[check_type]['key']
+        payload[key] = [check for check in payload[key] or [] if check['name'] != name]
+
+        if plan['check']['present']:
+            payload[key].append({
+                **plan['check'],
+                'readonly': False,
+                'integrations': {
+                    'OverrideError': False,
+                    'OverrideInfo': False,
+                    'OverrideWarning': False,
+                    'Routing': None,
+                    'Type': ''
+                },
+            })
+
+    return payload
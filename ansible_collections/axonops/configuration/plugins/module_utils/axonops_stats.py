@@ -0,0 +1,132 @@
+import threading
+import time
+
+
+def endpoint_template(rel_url: str, org_name: str, cluster_type: str) -> str:
+    """
+    Replace the variable parts of the url so the calls can be grouped, e.g.
+    /api/v1/alert-rules/<org>/cassandra/<cluster>/<id> is /api/v1/alert-rules/{org}/{cluster_type}/{cluster}/{id}.
+    Only the names of the query parameters are kept.
+    """
+    path, _, query = rel_url.partition('?')
+    parts = [part for part in path.split('/') if part]
+
+    if org_name in parts[2:]:
+        org_index = parts.index(org_name, 2)
+        parts[org_index] = '{org}'
+        if org_index + 1 < len(parts) and parts[org_index + 1] == cluster_type:
+            parts[org_index + 1] = '{cluster_type}'
+            parts[org_index + 2:] = ['{cluster}' if i == 0 else '{id}' for i in range(len(parts) - org_index - 2)]
+
+    template = '/' + '/'.join(parts)
+    if query:
+        template += '?' + '&'.join(param.split('=', 1)[0] for param in query.split('&'))
+    return template
+
+
+class RequestStats:
+    """
+    Counters of the requests sent by the AxonOps client, grouped by method and endpoint template.
+    The list of all the calls is only kept when `debug` is set.
+    """
+
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self.requests = 0
+        self.retries = 0
+        self.rate_limit_wait = 0.0
+        self.snapshot_hits = 0
+        self.snapshot_misses = 0
+        self.endpoints = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def add_request(self):
+        """
+        count a request sent to the server, every retry is one
+        """
+        with self._lock:
+            self.requests += 1
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def add_snapshot(self, hit: bool):
+        """
+        count a GET served from the run snapshot, or that had to be sent
+        """
+        with self._lock:
+            if hit:
+                self.snapshot_hits += 1
+            else:
+                self.snapshot_misses += 1
+
+    def add_rate_limit_wait(self, wait: float):
+        with self._lock:
+            self.rate_limit_wait += wait
+
+    def record(self, method: str, endpoint: str, latency: float, status: int | None = None, bytes_sent: int = 0,
+               bytes_received: int = 0, retries: int = 0, cached: bool = False):
+        """
+        record a call to do_request, `status` is None when it failed without an answer
+        and `cached` is set when the response cache was used, without a request or after a 304
+        """
+        key = f'{method.upper()} {endpoint}'
+        failed = status is None or status >= 400
+        with self._lock:
+            endpoint_stats = self.endpoints.get(key)
+            if endpoint_stats is None:
+                endpoint_stats = self.endpoints[key] = {
+                    'calls': 0, 'errors': 0, 'cached': 0, 'retries': 0, 'time': 0.0, 'max_time': 0.0,
+                    'bytes_sent': 0, 'bytes_received': 0,
+                }
+            endpoint_stats['calls'] += 1
+            endpoint_stats['errors'] += failed
+            endpoint_stats['cached'] += cached
+            endpoint_stats['retries'] += retries
+            endpoint_stats['time'] += latency
+            endpoint_stats['max_time'] = max(endpoint_stats['max_time'], latency)
+            endpoint_stats['bytes_sent'] += bytes_sent
+            endpoint_stats['bytes_received'] += bytes_received
+
+            if self.debug:
+                self.calls.append({
+                    'method': method.upper(),
+                    'endpoint': endpoint,
+                    'status': status,
+                    'time': round(latency, 4),
+                    'bytes_sent': bytes_sent,
+                    'bytes_received': bytes_received,
+                    'retries': retries,
+                    'cached': cached,
+                    'started': round(time.time() - latency, 4),
+                })
+
+    def summary(self) -> dict:
+        """
+        the aggregates returned by the modules as `axonops_stats`, with the call list in debug mode
+        """
+        with self._lock:
+            endpoints = {}
+            for key, endpoint_stats in self.endpoints.items():
+                endpoints[key] = dict(endpoint_stats, time=round(endpoint_stats['time'], 4),
+                                      max_time=round(endpoint_stats['max_time'], 4))
+
+            summary = {
+                'requests': self.requests,
+                'retries': self.retries,
+                'rate_limit_wait': round(self.rate_limit_wait, 3),
+                'snapshot_hits': self.snapshot_hits,
+                'snapshot_misses': self.snapshot_misses,
+                'calls': sum(e['calls'] for e in endpoints.values()),
+                'errors': sum(e['errors'] for e in endpoints.values()),
+                'cached': sum(e['cached'] for e in endpoints.values()),
+                'time': round(sum(e['time'] for e in endpoints.values()), 4),
+                'bytes_sent': sum(e['bytes_sent'] for e in endpoints.values()),
+                'bytes_received': sum(e['bytes_received'] for e in endpoints.values()),
+                'endpoints': endpoints,
+            }
+            if self.debug:
+                summary['call_log'] = list(self.calls)
+            return summary
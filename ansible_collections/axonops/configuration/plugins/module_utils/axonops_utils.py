@@ -10,6 +10,10 @@ def base_module_args() -> dict:
         "base_url": {"type": 'str', "required": False, "fallback": (env_fallback, ['AXONOPS_URL'])},
         "org": {"type": 'str', "required": True, "fallback": (env_fallback, ['AXONOPS_ORG'])},
         "cluster": {"type": 'str', "required": False, "fallback": (env_fallback, ['AXONOPS_CLUSTER'])},
+        # no environment fallback, it would apply every task to the clusters listed there instead of its cluster
+        "clusters": {"type": 'list', "elements": 'str', "required": False},
+        "cluster_workers": {"type": 'int', "required": False, "fallback": (env_fallback, ['AXONOPS_CLUSTER_WORKERS']),
+                            'default': 8},
         "auth_token": {"type": 'str', "required": False, "fallback": (env_fallback, ['AXONOPS_TOKEN'])},
         "username": {"type": 'str', "required": False, "fallback": (env_fallback, ['AXONOPS_USERNAME'])},
         "password": {"type": 'str', "required": False, "fallback": (env_fallback, ['AXONOPS_PASSWORD'])},
@@ -18,6 +22,36 @@ def base_module_args() -> dict:
         "api_token": {"type": 'str', "required": False, "fallback": (env_fallback, ['AXONOPS_API_TOKEN'])},
         "override_saas": {"type": 'bool', "required": False, "fallback": (env_fallback, ['AXONOPS_OVERRIDE_SAAS']),
                           'default': False},
+        "pool_size": {"type": 'int', "required": False, "fallback": (env_fallback, ['AXONOPS_POOL_SIZE']),
+                      'default': 4},
+        "pool_idle_timeout": {"type": 'float', "required": False,
+                              "fallback": (env_fallback, ['AXONOPS_POOL_IDLE_TIMEOUT']), 'default': 30.0},
+        "token_cache": {"type": 'bool', "required": False, "fallback": (env_fallback, ['AXONOPS_TOKEN_CACHE']),
+                        'default': True},
+        "response_cache": {"type": 'bool', "required": False, "fallback": (env_fallback, ['AXONOPS_RESPONSE_CACHE']),
+                           'default': True},
+        "response_cache_ttl": {"type": 'float', "required": False,
+                               "fallback": (env_fallback, ['AXONOPS_RESPONSE_CACHE_TTL']), 'default': 10.0},
+        "retry_max_attempts": {"type": 'int', "required": False,
+                               "fallback": (env_fallback, ['AXONOPS_RETRY_MAX_ATTEMPTS']), 'default': 4},
+        "retry_base_delay": {"type": 'float', "required": False,
+                             "fallback": (env_fallback, ['AXONOPS_RETRY_BASE_DELAY']), 'default': 0.5},
+        "retry_jitter": {"type": 'bool', "required": False, "fallback": (env_fallback, ['AXONOPS_RETRY_JITTER']),
+                         'default': True},
+        "rate_limit": {"type": 'float', "required": False, "fallback": (env_fallback, ['AXONOPS_RATE_LIMIT']),
+                       'default': 0},
+        "rate_limit_burst": {"type": 'int', "required": False,
+                             "fallback": (env_fallback, ['AXONOPS_RATE_LIMIT_BURST']), 'default': 0},
+        "stats_debug": {"type": 'bool', "required": False, "fallback": (env_fallback, ['AXONOPS_STATS_DEBUG']),
+                        'default': False},
+        "circuit_breaker_threshold": {"type": 'int', "required": False,
+                                      "fallback": (env_fallback, ['AXONOPS_CIRCUIT_BREAKER_THRESHOLD']),
+                                      'default': 5},
+        "circuit_breaker_reset": {"type": 'float', "required": False,
+                                  "fallback": (env_fallback, ['AXONOPS_CIRCUIT_BREAKER_RESET']), 'default': 30.0},
+        "run_id": {"type": 'str', "required": False, "fallback": (env_fallback, ['AXONOPS_RUN_ID'])},
+        "node_index_ttl": {"type": 'float', "required": False,
+                           "fallback": (env_fallback, ['AXONOPS_NODE_INDEX_TTL']), 'default': 60.0},
 
     }
 
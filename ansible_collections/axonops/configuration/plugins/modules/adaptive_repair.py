@@ -124,43 +124,17 @@ EXAMPLES = r'''
 
 '''
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, \
     dicts_are_different
 
 
-def run_module():
-    module_args = make_module_args({
-        'active': {'type': 'bool', 'default': True},
-        'gc_grace': {'type': 'int', 'required': False, 'default': '86400'},
-        'segments': {'type': 'int', 'required': False},
-        'parallelism': {'type': 'int', 'required': False, 'default': '10'},
-        'blacklisted': {'type': 'list', 'required': False, 'default': []},
-        'filter_twcs': {'type': 'bool', 'required': False, 'default': True},
-        'retries': {'type': 'int', 'required': False, 'default': '3'},
-        'segment_target_size_mb': {'type': 'int', 'required': False}
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        mutually_exclusive=[
-            ('segments', 'segment_target_size_mb'),
-        ]
-    )
-
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
     adaptive_repair_url = \
         f"/api/v1/adaptiveRepair/{module.params['org']}/{axonops.get_cluster_type()}/{module.params['cluster']}"
 
@@ -222,6 +196,7 @@ def run_module():
         rel_url=adaptive_repair_url,
         method='POST',
         json_data=payload,
+        idempotent=True,
     )
 
     if return_error:
@@ -230,6 +205,32 @@ def run_module():
     module.exit_json(**result)
 
 
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'active': {'type': 'bool', 'default': True},
+        'gc_grace': {'type': 'int', 'required': False, 'default': '86400'},
+        'segments': {'type': 'int', 'required': False},
+        'parallelism': {'type': 'int', 'required': False, 'default': '10'},
+        'blacklisted': {'type': 'list', 'required': False, 'default': []},
+        'filter_twcs': {'type': 'bool', 'required': False, 'default': True},
+        'retries': {'type': 'int', 'required': False, 'default': '3'},
+        'segment_target_size_mb': {'type': 'int', 'required': False}
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        mutually_exclusive=[
+            ('segments', 'segment_target_size_mb'),
+        ]
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
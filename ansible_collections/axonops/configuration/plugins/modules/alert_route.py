@@ -104,63 +104,29 @@ RETURN = r'''
 TODO
 '''
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
-from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, \
-    dicts_are_different
-
-# Type name mapping Ansible => AxonOps
-types_map = {
-    'global': 'Global',
-    'metrics': 'Metrics',
-    'backups': 'Backups',
-    'servicechecks': 'Service%20Checks',
-    'nodes': 'Nodes',
-    'commands': 'Commands',
-    'repairs': 'Repairs',
-    'rollingrestart': 'Rolling%20Restart'
-}
+from copy import deepcopy
 
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_alert_routes import \
+    ALERT_ROUTE_OPTIONS, ALERT_ROUTE_REQUIRED_TOGETHER, alert_routes_requests, index_alert_routes, \
+    plan_alert_route, update_alert_routes_state
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
 
-def run_module():
-    module_args = make_module_args({
-        'type': {'type': 'str', 'required': True, 'choices': types_map.keys()},
-        'severity': {'type': 'str', 'required': True, 'choices': ['info', 'warning', 'error']},
-        'integration_type': {'type': 'str'},
-        'integration_name': {'type': 'str'},
-        'enable_override': {'type': 'bool', 'required': False, 'default': True},
-        'present': {'type': 'bool', 'default': True},
-    })
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_together=[
-            ('integration_type', 'integration_name'),
-        ],
-    )
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    org = module.params['org']
     cluster = module.params['cluster']
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
-    integrations, error = axonops.do_request(f"/api/v1/integrations/{org}/{axonops.get_cluster_type()}/{cluster}")
+    # the integrations are read once, find_integration_by_name_and_type uses the same output
+    integrations, error = axonops.get_integration_output(cluster)
     if error is not None:
         module.fail_json(msg=error)
         return
 
-    routings = integrations['Routings'] if integrations and 'Routings' in integrations else []
-
     integration, error = axonops.find_integration_by_name_and_type(
         cluster, module.params['integration_type'], module.params['integration_name'])
     if error is not None:
@@ -179,74 +145,23 @@ def run_module():
         integration_id = integration['ID']
 
     # See if this route is already configured
-    is_global = module.params['type'] == 'global'
-    exists = False
-    old_override_enabled = False
-    override_property = 'Override' + module.params['severity'].title()
-    axon_type = types_map[module.params['type']]
-    for routing in routings:
-        if 'Type' in routing and routing['Type'] == axon_type and 'Routing' in routing:
-            if override_property in routing:
-                old_override_enabled = routing[override_property]
-
-                # if it is only a override and it is set, set as exists
-                if not module.params['integration_name']:
-                    exists = True
-            for entry in routing['Routing'] or []:
-                if 'Severity' in entry and 'ID' in entry \
-                        and entry['Severity'] == module.params['severity'] and integration_id \
-                        and entry['ID'] == integration_id:
-                    exists = True
-                    break
-
-    old_data = {
-        'type': module.params['type'],
-        'severity': module.params['severity'],
-        'integration_type': module.params['integration_type'] or "",
-        'integration_name': module.params['integration_name'] or "",
-        'present': exists,
-    }
-    new_data = {
-        'type': module.params['type'],
-        'severity': module.params['severity'],
-        'integration_type': module.params['integration_type'] or "",
-        'integration_name': module.params['integration_name'] or "",
-        'present': module.params['present'],
-    }
-
-    if not is_global:
-        old_data['enable_override'] = old_override_enabled
-        new_data['enable_override'] = module.params['enable_override']
-
-    # Work out what changes are required and make the diff
-    changed = dicts_are_different(new_data, old_data)
-    result['changed'] = changed
-    result['diff'] = {'before': old_data, 'after': new_data}
+    old_state = index_alert_routes(integrations)
+    plan = plan_alert_route(module.params, integration_id, old_state)
+    result['changed'] = plan['changed']
+    result['diff'] = plan['diff']
 
     # Exit if in check mode or no changes
-    if module.check_mode or not changed:
+    if module.check_mode or not plan['changed']:
         module.exit_json(**result)
         return
 
-    # Change the override setting
-    if not is_global and old_data['enable_override'] != new_data['enable_override']:
-        _, error = axonops.do_request(
-            rel_url=f"api/v1/integrations-override/"
-                    f"{org}/{axonops.get_cluster_type()}/{cluster}/{axon_type}/{module.params['severity']}",
-            method='PUT',
-            json_data={'value': new_data['enable_override']}
-        )
-        if error is not None:
-            module.fail_json(msg=error)
-            return
-
-    # Add or delete the route if required
-    if old_data['present'] != new_data['present']:
-        _, error = axonops.do_request(
-            rel_url=f"api/v1/integrations-routing/"
-                    f"{org}/{axonops.get_cluster_type()}/{cluster}/{axon_type}/{module.params['severity']}/{integration_id}",
-            method='POST' if module.params['present'] else 'DELETE'
-        )
+    # Change the override setting, then add or delete the route if required
+    new_state = deepcopy(old_state)
+    update_alert_routes_state(new_state, plan)
+    for request in alert_routes_requests(axonops, cluster, old_state, new_state):
+        _, error = axonops.do_request(**request)
+        # the routings of the registry are read again the next time
+        axonops.forget_integrations(cluster)
         if error is not None:
             module.fail_json(msg=error)
             return
@@ -254,6 +169,21 @@ def run_module():
     module.exit_json(**result)
 
 
+def module_kwargs() -> dict:
+    module_args = make_module_args(ALERT_ROUTE_OPTIONS)
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        required_together=ALERT_ROUTE_REQUIRED_TOGETHER,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.alert_routes
+
+short_description: Configure all the alert routes of a cluster in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure a list of alert routes and their override flags in one task.
+    - The integrations and their routings are read once, the routes are compared in the order of the list
+      as if they were applied one by one, then only the overrides and the routes that end up different
+      are sent, at the same time.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the alert routes.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    routes:
+        description:
+            - The alert routes, each one has the options of axonops.configuration.alert_route.
+        required: true
+        type: list
+        elements: dict
+'''
+
+EXAMPLES = r'''
+- name: Install all the alert routes of a cluster
+  axonops.configuration.alert_routes:
+    org: my_org
+    cluster: my_cluster
+    routes:
+      - integration_name: example_opsgenie_integration_ops
+        integration_type: opsgenie
+        type: global
+        severity: error
+        enable_override: false
+      - integration_name: example_slack_integration_backups
+        integration_type: slack
+        type: backups
+        severity: error
+        enable_override: true
+'''
+
+RETURN = r'''
+routes:
+    description: The result of each route, with its type, severity, integration, if it changed and the diff.
+    type: list
+    returned: always
+'''
+
+from copy import deepcopy
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_alert_routes import \
+    ALERT_ROUTE_OPTIONS, ALERT_ROUTE_REQUIRED_TOGETHER, alert_routes_requests, index_alert_routes, \
+    plan_alert_route, update_alert_routes_state
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'routes': [],
+    }
+
+    cluster = module.params['cluster']
+
+    # the integrations and the routings are read once for all the routes
+    registry, error = axonops.get_integration_registry(cluster)
+    if error is not None:
+        module.fail_json(msg=error, **result)
+
+    old_state = index_alert_routes(registry.integrations)
+    new_state = deepcopy(old_state)
+
+    # compare the routes in order, each one with the routes as the previous ones left them
+    errors = []
+    for route in module.params['routes']:
+        integration_id = None
+        if route['integration_type'] and route['integration_name']:
+            integration = registry.find_by_name_and_type(route['integration_type'], route['integration_name'])
+            if integration is None or 'ID' not in integration:
+                errors.append(f"The integration of type {route['integration_type']} with name "
+                              f"{route['integration_name']} was not found in AxonOps")
+                continue
+            integration_id = integration['ID']
+
+        plan = plan_alert_route(route, integration_id, new_state)
+        update_alert_routes_state(new_state, plan)
+
+        result['routes'].append({
+            'type': route['type'],
+            'severity': route['severity'],
+            'integration_type': route['integration_type'] or '',
+            'integration_name': route['integration_name'] or '',
+            'changed': plan['changed'],
+            'diff': plan['diff'],
+        })
+
+    if errors:
+        module.fail_json(msg='; '.join(errors), **result)
+
+    # only the overrides and the routes that end up different are sent
+    requests = alert_routes_requests(axonops, cluster, old_state, new_state)
+    result['changed'] = bool(requests)
+    result['diff'] = [{'before_header': f"{route['type']} {route['severity']} {route['integration_name']}",
+                       'after_header': f"{route['type']} {route['severity']} {route['integration_name']}",
+                       **route['diff']} for route in result['routes'] if route['changed']]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not requests:
+        module.exit_json(**result)
+        return
+
+    # the overrides are changed before the routes, like alert_route does, each group at the same time
+    override_requests = [request for request in requests if request['method'] == 'PUT']
+    route_requests = [request for request in requests if request['method'] != 'PUT']
+    for batch in [override_requests, route_requests]:
+        if not batch:
+            continue
+        responses = axonops.do_requests(batch)
+        axonops.forget_integrations(cluster)
+        errors = [f"{request['method']} {request['rel_url']}: {error}"
+                  for request, (_, error) in zip(batch, responses) if error is not None]
+        if errors:
+            module.fail_json(msg="Failed to apply the alert routes: " + '; '.join(errors), **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'routes': {'type': 'list', 'elements': 'dict', 'required': True, 'options': ALERT_ROUTE_OPTIONS,
+                   'required_together': ALERT_ROUTE_REQUIRED_TOGETHER},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
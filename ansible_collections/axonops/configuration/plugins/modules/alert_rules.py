@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.alert_rules
+
+short_description: Configure all the metric alerting rules of a cluster in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure a list of metric alerting rules in one task.
+    - The alert rules, the dashboard templates and the integrations are read once,
+      then only the rules that are different are sent to AxonOps.
+    - The same as looping over axonops.configuration.alert_rule, when a rule name is repeated the last one wins.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the alert rules.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    rules:
+        description:
+            - The alert rules, each one has the options of axonops.configuration.alert_rule.
+        required: true
+        type: list
+        elements: dict
+'''
+
+EXAMPLES = r'''
+- name: Install all the alert rules of a cluster
+  axonops.configuration.alert_rules:
+    org: my_org
+    cluster: my_cluster
+    rules:
+      - name: CPU usage
+        dashboard: System
+        chart: CPU usage per host
+        operator: '>='
+        warning_value: 80
+        critical_value: 90
+        duration: 1h
+      - name: Disk usage
+        dashboard: System
+        chart: Disk % Usage $mountpoint
+        present: false
+'''
+
+RETURN = r'''
+rules:
+    description: The result of each rule, with its name, if it changed, the action sent and the diff.
+    type: list
+    returned: always
+'''
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_alert_rules import \
+    ALERT_RULE_OPTIONS, ALERT_RULE_REQUIRED_IF, alert_rule_name, alert_rule_request, fetch_alert_rules_state, \
+    plan_alert_rule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'rules': [],
+    }
+
+    cluster = module.params['cluster']
+
+    # the last definition of a rule wins, as it would when applying them one by one
+    rules = {}
+    for rule in module.params['rules']:
+        rules[alert_rule_name(rule)] = rule
+
+    # Get existing alerts, dashboard templates and integrations once for all the rules
+    state, error = fetch_alert_rules_state(axonops, cluster, any(rule['routing'] for rule in rules.values()))
+    if error is not None:
+        module.fail_json(msg=error, **result)
+
+    # compare all the rules before changing anything
+    plans = []
+    errors = []
+    for name, rule in rules.items():
+        plan, error = plan_alert_rule(axonops, rule, cluster, state)
+        if error is not None:
+            errors.append(f"{name}: {error}")
+            continue
+        plans.append((name, plan))
+
+        result['rules'].append({
+            'name': name,
+            'changed': plan['changed'],
+            'action': plan['action'],
+            'diff': plan.get('diff'),
+        })
+
+    if errors:
+        module.fail_json(msg='; '.join(errors), **result)
+
+    changed_plans = [(name, plan) for name, plan in plans if plan['action']]
+    result['changed'] = bool(changed_plans)
+    result['diff'] = [{'before_header': name, 'after_header': name, **plan['diff']} for name, plan in changed_plans]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not changed_plans:
+        module.exit_json(**result)
+        return
+
+    # Create, update and delete the alert rules
+    responses = axonops.do_requests([alert_rule_request(axonops, cluster, plan) for _, plan in changed_plans])
+    errors = [f"{name}: {error}" for (name, _), (_, error) in zip(changed_plans, responses) if error is not None]
+    if errors:
+        module.fail_json(msg="Failed to apply the alert rules: " + '; '.join(errors), **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'rules': {'type': 'list', 'elements': 'dict', 'required': True, 'options': ALERT_RULE_OPTIONS,
+                  'required_if': ALERT_RULE_REQUIRED_IF},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.backups
+
+short_description: Configure all the backup schedules of a cluster in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure the backups of a cluster in one task, they are identified by their tag.
+    - The scheduled snapshots are read once and decoded once, then only the backups that are different
+      are deleted and created again.
+    - The same as looping over axonops.configuration.backup, when a tag is repeated the last one wins.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the backups.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    backups:
+        description:
+            - The backups, each one has the options of axonops.configuration.backup.
+        required: false
+        type: list
+        elements: dict
+    s3_access_key_id:
+        description:
+            - The S3 access key id of the backups that don't set their own.
+        required: false
+        type: str
+    s3_secret_access_key:
+        description:
+            - The S3 secret access key of the backups that don't set their own.
+        required: false
+        type: str
+'''
+
+EXAMPLES = r'''
+- name: Setup all the backups of a cluster
+  axonops.configuration.backups:
+    org: my_org
+    cluster: my_cluster
+    s3_access_key_id: key-id
+    s3_secret_access_key: access-key
+    backups:
+      - tag: daily-backup
+        datacenters:
+          - dc1
+        remote: true
+        remote_type: s3
+        remote_path: my-backup-bucket/cassandra-backups
+        s3_region: eu-west-1
+        schedule_expr: '0 1 * * *'
+      - tag: local-backup
+        datacenters:
+          - dc1
+        local_retention: 7d
+      - tag: old-backup
+        datacenters:
+          - dc1
+        present: false
+'''
+
+RETURN = r'''
+backups:
+    description: The result of each backup, with its tag, if it changed and the diff.
+    type: list
+    returned: always
+'''
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_backups import BACKUP_OPTIONS, \
+    BACKUP_REQUIRED_IF, BACKUP_MUTUALLY_EXCLUSIVE, BACKUP_REQUIRED_TOGETHER, schedule_snapshot_url, \
+    cassandra_snapshot_url, index_backups, plan_backup
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'backups': [],
+    }
+
+    cluster = module.params['cluster']
+
+    # Get and decode the scheduled snapshots once for all the backups
+    saas_backups, return_error = axonops.do_request(schedule_snapshot_url(axonops, cluster))
+    if return_error:
+        module.fail_json(msg=return_error, **result)
+    existing_backups = index_backups(saas_backups)
+
+    # the last definition of a backup wins, as it would when applying them one by one
+    backups = {backup['tag']: backup for backup in module.params['backups']}
+
+    # Plan all the backups before changing anything
+    plans = []
+    for tag, backup in backups.items():
+        for field in ['s3_access_key_id', 's3_secret_access_key']:
+            if backup[field] is None:
+                backup[field] = module.params[field]
+
+        # the nodes are read once, only when a backup is limited to some nodes
+        requested_nodes, return_error = axonops.find_nodes_ids(backup['nodes'], axonops.org_name, cluster)
+        if return_error:
+            module.fail_json(msg=f"backup {tag}: {return_error}", **result)
+
+        plan, return_error = plan_backup(backup, existing_backups.get(tag), requested_nodes)
+        if return_error:
+            module.fail_json(msg=f"backup {tag}: {return_error}", **result)
+        plans.append((tag, plan))
+
+        result['backups'].append({
+            'tag': tag,
+            'changed': plan['changed'],
+            'diff': plan['diff'],
+        })
+
+    changed_plans = [(tag, plan) for tag, plan in plans if plan['changed']]
+    result['changed'] = bool(changed_plans)
+    result['diff'] = [{'before_header': f'backup {tag}', 'after_header': f'backup {tag}', **plan['diff']}
+                      for tag, plan in changed_plans]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not changed_plans:
+        module.exit_json(**result)
+        return
+
+    # Delete all the changed backups at once, they are created again with the same ID
+    existing_ids = [plan['existing_id'] for _, plan in changed_plans if plan['existing_id']]
+    if existing_ids:
+        _, return_error = axonops.do_request(
+            rel_url=schedule_snapshot_url(axonops, cluster),
+            method='DELETE',
+            json_data=existing_ids,
+        )
+
+        if return_error:
+            module.fail_json(msg=return_error, **result)
+
+    # Create the backups that are present, they are independent of each other
+    created_plans = [(tag, plan) for tag, plan in changed_plans if plan['payload']]
+    responses = axonops.do_requests([{
+        'rel_url': cassandra_snapshot_url(axonops, cluster),
+        'method': 'POST',
+        'json_data': plan['payload'],
+    } for _, plan in created_plans])
+    errors = [f"backup {tag}: {error}" for (tag, _), (_, error) in zip(created_plans, responses) if error is not None]
+    if errors:
+        module.fail_json(msg="Failed to apply the backups: " + '; '.join(errors), **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'backups': {'type': 'list', 'elements': 'dict', 'default': [], 'options': BACKUP_OPTIONS,
+                    'required_if': BACKUP_REQUIRED_IF, 'mutually_exclusive': BACKUP_MUTUALLY_EXCLUSIVE,
+                    'required_together': BACKUP_REQUIRED_TOGETHER},
+        's3_access_key_id': {'type': 'str', 'no_log': True},
+        's3_secret_access_key': {'type': 'str', 'no_log': True},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -71,61 +71,17 @@ EXAMPLES = r'''
 import json
 import uuid
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, \
     dicts_are_different, string_to_bool, string_or_none, bool_to_string
 
 
-def run_module():
-    module_args = make_module_args({
-        'present': {'type': 'bool', 'default': True},
-        'remote_path': {'type': 'str', 'required': False, 'default': ''},
-        'remote_retention': {'type': 'str', 'default': "60d"},
-        'remote_type': {'type': 'str', 'required': False, 'default': 'local', 'choices': ['local', 's3', 'sftp']},
-        'timeout': {'type': 'str', 'default': "10h"},
-        'transfers': {'type': 'int', 'default': 0},
-        'bw_limit': {'type': 'str', 'required': False, 'default': ''},
-        'datacenters': {'type': 'list', 'required': True},
-        # AWS S3 remote only
-        's3_region': {'type': 'str', 'default': 'us-east-1'},
-        's3_access_key_id': {'type': 'str', 'default': None},
-        's3_secret_access_key': {'type': 'str', 'default': None},
-        's3_storage_class': {'required': False, 'default': 'STANDARD',
-                             'choices': ['default', 'STANDARD', 'reduced_redundancy',
-                                         'standard_ia', 'onezone_ia', 'glacier', 'deep_archive',
-                                         'intelligent_tiering']},
-        's3_acl': {'required': False, 'default': 'private', 'choices': ['private', 'public-read', 'public-read-write',
-                                                                        'authenticated-read', 'bucket-owner-read']},
-        's3_encryption': {'required': False, 'default': 'AES256', 'choices': ['none', 'AES256']},
-        's3_disable_checksum': {'type': 'bool', 'default': False},
-        # SSH/SFTP remote only
-        'host': {'type': 'str', 'default': None},
-        'ssh_user': {'type': 'str', 'default': None},
-        'ssh_pass': {'type': 'str', 'default': None},
-        'key_file': {'type': 'str', 'default': None}
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=[
-            ('remote_type', 's3', ('s3_region',))
-        ],
-    )
-
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
     commitlog_settings_url = (f"/api/v1/cassandraCommitLogsSettings/"
                               f"{module.params['org']}/{axonops.get_cluster_type()}/{module.params['cluster']}")
 
@@ -325,6 +281,50 @@ def run_module():
 
     module.exit_json(**result)
 
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'present': {'type': 'bool', 'default': True},
+        'remote_path': {'type': 'str', 'required': False, 'default': ''},
+        'remote_retention': {'type': 'str', 'default': "60d"},
+        'remote_type': {'type': 'str', 'required': False, 'default': 'local', 'choices': ['local', 's3', 'sftp']},
+        'timeout': {'type': 'str', 'default': "10h"},
+        'transfers': {'type': 'int', 'default': 0},
+        'bw_limit': {'type': 'str', 'required': False, 'default': ''},
+        'datacenters': {'type': 'list', 'required': True},
+        # AWS S3 remote only
+        's3_region': {'type': 'str', 'default': 'us-east-1'},
+        's3_access_key_id': {'type': 'str', 'default': None},
+        's3_secret_access_key': {'type': 'str', 'default': None},
+        's3_storage_class': {'required': False, 'default': 'STANDARD',
+                             'choices': ['default', 'STANDARD', 'reduced_redundancy',
+                                         'standard_ia', 'onezone_ia', 'glacier', 'deep_archive',
+                                         'intelligent_tiering']},
+        's3_acl': {'required': False, 'default': 'private', 'choices': ['private', 'public-read', 'public-read-write',
+                                                                        'authenticated-read', 'bucket-owner-read']},
+        's3_encryption': {'required': False, 'default': 'AES256', 'choices': ['none', 'AES256']},
+        's3_disable_checksum': {'type': 'bool', 'default': False},
+        # SSH/SFTP remote only
+        'host': {'type': 'str', 'default': None},
+        'ssh_user': {'type': 'str', 'default': None},
+        'ssh_pass': {'type': 'str', 'default': None},
+        'key_file': {'type': 'str', 'default': None}
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        required_if=[
+            ('remote_type', 's3', ('s3_region',))
+        ],
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
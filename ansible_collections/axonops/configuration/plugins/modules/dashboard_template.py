@@ -63,101 +63,40 @@ options:
         type: str
 '''
 
-import uuid
-from ansible.module_utils.basic import AnsibleModule
-from copy import copy
-
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
-from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import dicts_are_different, \
-    make_module_args
-
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_dashboard_templates import \
+    DASHBOARD_TEMPLATE_OPTIONS, dashboard_templates_payload, dashboard_templates_url, index_dashboard_templates, \
+    plan_dashboard_template
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
 
-def run_module():
-    module_args = make_module_args({
-        'present': {'type': 'bool', 'required': False, 'default': True},
-        'name': {'type': 'str', 'required': True},
-        'filters': {'type': 'list', 'required': False},
-        'panels': {'type': 'list', 'required': False},
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
 
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
-    # e.g  http://127.0.0.1:3000/api/v1/dashboardtemplate/demo/cassandra/demo-cluster
-    dashboardtemplate_url = (f"/api/v1/dashboardtemplate/"
-                             f"{module.params['org']}/{axonops.get_cluster_type()}/{module.params['cluster']}?dashver=2.0")
+    dashboardtemplate_url = dashboard_templates_url(axonops, module.params['cluster'])
 
     old_templates, return_error = axonops.do_request(dashboardtemplate_url)
     if return_error:
         module.fail_json(msg=return_error, **result)
 
-    # the old template if exists
-    old_template_found = None
-    # the position where we found the old template
-    old_template_position = None
-    dashboards_to_send = []
-    if 'dashboards' in old_templates:
-        for i, old_template in enumerate(old_templates['dashboards']):
-            if 'name' in old_template and old_template['name'] == module.params['name']:
-                old_template_found = old_template
-                old_template_position = i
-            else:
-                dashboards_to_send.append(old_template)
-
-    if old_template_found:
-        old_data = {
-            'present': True,
-            'name': old_template_found['name'],
-            'filters': old_template_found['filters'],
-            'panels': old_template_found['panels'],
-        }
-    else:
-        old_data = {
-            'present': False,
-        }
-
-    new_data = {
-        'present': module.params['present'],
-        'name': module.params['name'],
-        'filters': module.params['filters'],
-        'panels': module.params['panels'],
-    }
+    old_template = index_dashboard_templates(old_templates).get(module.params['name'])
+    plan = plan_dashboard_template(module.params, old_template)
 
-    changed = dicts_are_different(new_data, old_data)
-    result['changed'] = changed
-    result['diff'] = {'before': old_data, 'after': new_data}
+    result['changed'] = plan['changed']
+    result['diff'] = plan['diff']
 
-    if module.check_mode or not changed:
+    if module.check_mode or not plan['changed']:
         module.exit_json(**result)
         return
 
-    result['test'] = len(old_templates['dashboards'])
-    # if we have the position of the old index, we use it to keep the order
-    if old_template_position:
-        dashboards_to_send.insert(old_template_position, new_data)
-    else:
-        dashboards_to_send.append(new_data)
-    payload = {
-        'type': module.params['cluster_type'],
-        'dashboards': dashboards_to_send
-    }
+    payload = dashboard_templates_payload(old_templates, [(module.params['name'], plan)],
+                                          module.params['cluster_type'])
 
-    # result['payload'] = {'payload': payload}
-    _, error = axonops.do_request(rel_url=dashboardtemplate_url, method='PUT', json_data=payload)
+    _, error = axonops.do_request(rel_url=dashboardtemplate_url, method='PUT', json_data=payload,
+                                  idempotent=True)
     if error is not None:
         module.fail_json(msg="Failed to create dashboard: " + str(error), **result)
         return
@@ -165,6 +104,20 @@ def run_module():
     module.exit_json(**result)
 
 
+def module_kwargs() -> dict:
+    module_args = make_module_args(DASHBOARD_TEMPLATE_OPTIONS)
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.dashboard_templates
+
+short_description: Configure all the dashboard templates of a cluster in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure a list of dashboards in one task.
+    - The dashboard templates are read once and written back once, only when a dashboard is different.
+      The dashboards keep the order of the server, the new ones are added at the end.
+    - The same as looping over axonops.configuration.dashboard_template, when a dashboard name is repeated
+      the last one wins.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the dashboards.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    dashboards:
+        description:
+            - The dashboards, each one has the options of axonops.configuration.dashboard_template.
+        required: true
+        type: list
+        elements: dict
+'''
+
+EXAMPLES = r'''
+- name: Install all the dashboards of a cluster
+  axonops.configuration.dashboard_templates:
+    org: my_org
+    cluster: my_cluster
+    dashboards: "{{ (lookup('file', 'config/my_org/dashboards.yml') | from_yaml).axonops_dashboard_templates }}"
+'''
+
+RETURN = r'''
+dashboards:
+    description: The result of each dashboard, with its name, if it changed and the diff.
+    type: list
+    returned: always
+changed_dashboards:
+    description: The names of the dashboards that changed.
+    type: list
+    returned: always
+'''
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_dashboard_templates import \
+    DASHBOARD_TEMPLATE_OPTIONS, dashboard_templates_payload, dashboard_templates_url, index_dashboard_templates, \
+    plan_dashboard_template
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'dashboards': [],
+        'changed_dashboards': [],
+    }
+
+    dashboardtemplate_url = dashboard_templates_url(axonops, module.params['cluster'])
+
+    # Get the dashboard templates once for all the dashboards
+    old_templates, return_error = axonops.do_request(dashboardtemplate_url)
+    if return_error:
+        module.fail_json(msg=return_error, **result)
+
+    existing_dashboards = index_dashboard_templates(old_templates)
+
+    # the last definition of a dashboard wins, as it would when applying them one by one
+    dashboards = {dashboard['name']: dashboard for dashboard in module.params['dashboards']}
+
+    plans = []
+    for name, dashboard in dashboards.items():
+        plan = plan_dashboard_template(dashboard, existing_dashboards.get(name))
+        plans.append((name, plan))
+
+        result['dashboards'].append({
+            'name': name,
+            'changed': plan['changed'],
+            'diff': plan['diff'],
+        })
+
+    changed_plans = [(name, plan) for name, plan in plans if plan['changed']]
+    result['changed'] = bool(changed_plans)
+    result['changed_dashboards'] = [name for name, _ in changed_plans]
+    result['diff'] = [{'before_header': name, 'after_header': name, **plan['diff']} for name, plan in changed_plans]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not changed_plans:
+        module.exit_json(**result)
+        return
+
+    # Write all the dashboards back at once
+    payload = dashboard_templates_payload(old_templates, changed_plans, module.params['cluster_type'])
+    _, error = axonops.do_request(rel_url=dashboardtemplate_url, method='PUT', json_data=payload,
+                                  idempotent=True)
+    if error is not None:
+        module.fail_json(msg="Failed to create dashboards: " + str(error), **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'dashboards': {'type': 'list', 'elements': 'dict', 'required': True, 'options': DASHBOARD_TEMPLATE_OPTIONS},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
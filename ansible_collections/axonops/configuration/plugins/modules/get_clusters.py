@@ -60,66 +60,40 @@ EXAMPLES = r'''
 
 '''
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
 
 
-def run_module():
-    module_args = make_module_args({
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      api_token=module.params['api_token'],override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
-    org_url = "/api/v1/orgs"
-
-    org_api_output, return_error = axonops.do_request(org_url)
+    # the cluster names by cluster type, sorted
+    clusters, return_error = axonops.get_clusters()
     if return_error:
         module.fail_json(msg=return_error, **result)
 
-    organizations = org_api_output['children']
-    module.debug("#### Orgs ####")
-    module.debug(organizations)
-    results_unsorted = {}
+    result['clusters'] = clusters
 
-    for organization in organizations:
-        clusters = organization['children']
-        module.debug("#### Clusters ####")
-        module.debug(clusters)
-        for cluster in clusters:
-            datacenters = cluster['children']
+    module.exit_json(**result)
 
-            for datacenter in datacenters:
 
-                cluster_name = datacenter['name']
-                cluster_type = datacenter["type"]
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+    })
 
-                # create a list of all cluster names for each type
-                if cluster_type in results_unsorted:
-                    results_unsorted[cluster_type].append(cluster_name)
-                else:
-                    results_unsorted[cluster_type] = [cluster_name]
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
 
-    # sort the cluster types alphabetically
-    result_sorted = {key: sorted(value) for key, value in results_unsorted.items()}
 
-    result['clusters'] = result_sorted
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile, fan_out=False)
 
-    module.exit_json(**result)
 
 def main():
     run_module()
@@ -81,36 +81,17 @@ url:
 
 '''
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, \
     dicts_are_different
 
 
-def run_module():
-    module_args = make_module_args({
-        'present': {'type': 'bool', 'default': True},
-        'id': {'type': 'str', 'required': True,
-               'choices': ['axon_agent_ip', 'axon_agent_hostname', 'env_hostname', 'comp_listen_address']},
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = dict(
         changed=False,
     )
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
     setting_url = \
         f"/api/v1/clusterSettings/{module.params['org']}/{axonops.get_cluster_type()}/{module.params['cluster']}"
     humanreadableid_url = \
@@ -141,6 +122,7 @@ def run_module():
         rel_url=humanreadableid_url,
         method='PUT',
         json_data={'HumanReadableID': module.params['id']},
+        idempotent=True,
     )
     if error is not None:
         module.fail_json(msg=error)
@@ -150,6 +132,24 @@ def run_module():
     return
 
 
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'present': {'type': 'bool', 'default': True},
+        'id': {'type': 'str', 'required': True,
+               'choices': ['axon_agent_ip', 'axon_agent_hostname', 'env_hostname', 'comp_listen_address']},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
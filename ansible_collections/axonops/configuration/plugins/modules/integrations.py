@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.integrations
+
+short_description: Configure all the alert endpoint integrations in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure the Slack, PagerDuty, OpsGenie, ServiceNow and Microsoft Teams integrations in one task.
+    - The options take the lists of alert_endpoints.yml, e.g. axonops_slack_integration is an alias of slack.
+    - The integrations are read once, then only the integrations that are different are created, updated
+      or deleted, at the same time.
+    - The same as looping over the <type>_integration modules, when a name is repeated in a type
+      the last one wins.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the integrations.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    slack:
+        description:
+            - The Slack integrations, each one has the options of axonops.configuration.slack_integration.
+        required: false
+        type: list
+        elements: dict
+        aliases: [axonops_slack_integration]
+    pagerduty:
+        description:
+            - The PagerDuty integrations, each one has the options of axonops.configuration.pagerduty_integration.
+        required: false
+        type: list
+        elements: dict
+        aliases: [axonops_pagerduty_integration]
+    opsgenie:
+        description:
+            - The OpsGenie integrations, each one has the options of axonops.configuration.opsgenie_integration.
+        required: false
+        type: list
+        elements: dict
+        aliases: [axonops_opsgenie_integration]
+    servicenow:
+        description:
+            - The ServiceNow integrations, each one has the options of axonops.configuration.servicenow_integration.
+        required: false
+        type: list
+        elements: dict
+        aliases: [axonops_servicenow_integration]
+    teams:
+        description:
+            - The Microsoft Teams integrations, each one has the options of axonops.configuration.teams_integration.
+        required: false
+        type: list
+        elements: dict
+        aliases: [axonops_teams_integration]
+'''
+
+EXAMPLES = r'''
+- name: Install all the alert endpoints
+  axonops.configuration.integrations:
+    org: my_org
+    cluster: my_cluster
+    slack:
+      - name: ops
+        webhook_url: https://hooks.slack.com/services/ADD/ME/HERE
+        channel: ops
+    pagerduty:
+      - name: ops
+        integration_key: 123456789abc
+    teams:
+      - name: old
+        present: false
+'''
+
+RETURN = r'''
+integrations:
+    description: The result of each integration, with its type, its name, if it changed, the action sent and the diff.
+    type: list
+    returned: always
+'''
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_integrations import \
+    INTEGRATION_TYPES, integration_request, plan_integration, record_integration
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'integrations': [],
+    }
+
+    cluster = module.params['cluster']
+
+    # Get the existing integrations once for all the types
+    registry, error = axonops.get_integration_registry(cluster)
+    if error is not None:
+        module.fail_json(msg=error, **result)
+
+    plans = []
+    for kind, integration_type in INTEGRATION_TYPES.items():
+        # the last definition of an integration wins, as it would when applying them one by one
+        definitions = {integration['name']: integration for integration in module.params[kind]}
+        for name, integration in definitions.items():
+            plan = plan_integration(axonops, kind, integration,
+                                    registry.find_by_name_and_type(integration_type['type'], name))
+            plans.append((kind, name, plan))
+
+            result['integrations'].append({
+                'type': kind,
+                'name': name,
+                'changed': plan['changed'],
+                'action': plan['action'],
+                'diff': plan['diff'],
+            })
+
+    changed_plans = [(kind, name, plan) for kind, name, plan in plans if plan['action']]
+    result['changed'] = bool(changed_plans)
+    result['diff'] = [{'before_header': f'{kind} {name}', 'after_header': f'{kind} {name}', **plan['diff']}
+                      for kind, name, plan in changed_plans]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not changed_plans:
+        module.exit_json(**result)
+        return
+
+    # Create, update and delete the integrations, they are independent of each other
+    responses = axonops.do_requests([integration_request(axonops, cluster, plan) for _, _, plan in changed_plans])
+    errors = []
+    for (kind, name, plan), (_, error) in zip(changed_plans, responses):
+        if error is not None:
+            errors.append(f"{kind} {name}: {error}")
+            # the integration may or may not have been written
+            axonops.forget_integrations(cluster)
+        else:
+            record_integration(axonops, cluster, plan)
+    if errors:
+        module.fail_json(msg="Failed to apply the integrations: " + '; '.join(errors), **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        kind: {'type': 'list', 'elements': 'dict', 'default': [], 'options': integration_type['options'],
+               'required_if': integration_type['required_if'], 'aliases': [f'axonops_{kind}_integration']}
+        for kind, integration_type in INTEGRATION_TYPES.items()
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -158,219 +158,57 @@ EXAMPLES = r'''
       level: error, debug
 '''
 
-import re
-import json
-import uuid
-
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
-from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, find_by_field, dicts_are_different, get_value_by_name, normalize_numbers, get_integration_id_by_name
-
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_log_alert_rules import \
+    LOG_ALERT_RULE_OPTIONS, check_log_alert_rule, fetch_log_alert_rules_state, log_alert_rule_request, \
+    plan_log_alert_rule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
 
 
-def run_module():
-    module_args = make_module_args({
-        'name': {'type': 'str', 'required': True},
-        'content': {'type': 'str', 'default': ''},
-        'description': {'type': 'str', 'default': ''},
-        'warning_value': {'type': 'int'},
-        'critical_value': {'type': 'int'},
-        'duration': {'type': 'str'},
-        'present': {'type': 'bool', 'default': True},
-        'operator': {'type': 'str', 'choices': ['=', '>=', '>', '<=', '<', '!='], 'default': '>='},
-        'level': {'type': 'str', 'default': ''},
-        'type': {'type': 'str', 'default': ''},
-        'source': {'type': 'str', 'default': ''},
-        'dc': {'type': 'list', 'default': []},
-        'rack': {'type': 'list', 'default': []},
-        'host_id': {'type': 'list', 'default': []},
-        'routing': {'type': 'dict', 'default': {}}
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    # check if level is correct or empty
-    level_choices = ['debug', 'error', 'warning', 'info']
-    for level in module.params['level'].split(',') or []:
-        if level not in level_choices and level:
-            module.fail_json(msg=f'{level} is not a valid level, accepted: {level_choices}')
-            return
+    error = check_log_alert_rule(module.params)
+    if error is not None:
+        module.fail_json(msg=error)
+        return
 
-    org = module.params['org']
     cluster = module.params['cluster']
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
-    alerts_url = f"/api/v1/alert-rules/{org}/{axonops.get_cluster_type()}/{cluster}"
-
-    # Get existing alerts
-    existing_alerts, error = axonops.do_request(alerts_url)
+    # Get existing alerts, and the integrations at the same time when they are needed for the routing
+    existing_alerts, error = fetch_log_alert_rules_state(axonops, cluster, bool(module.params['routing']))
     if error is not None:
         module.fail_json(msg=error)
         return
 
-    # check if it is an old alert or a new one
-    old_alert = None
-    if existing_alerts:
-        for alert in existing_alerts['metricrules']:
-            if 'events' in alert['expr'] and alert['alert'] == module.params['name']:
-                old_alert = alert
-
-    # Bail out early if the alert doesn't exist and we don't want it to
-    if not old_alert and not module.params['present']:
-        module.exit_json(**result)
+    plan, error = plan_log_alert_rule(axonops, module.params, cluster, existing_alerts)
+    if error is not None:
+        module.fail_json(msg=error)
         return
 
-    # If it is an old alert, read it
-    if old_alert:
-        pattern_external = r'events\{(.+)\}'
-        pattern_split_elements = r'(\w+)="((?:[^"\\]|\\.)*?)"'
-
-        match = re.search(pattern_external, old_alert['expr'])
-
-        old_alert_expr = {}
-        if match:
-            elements_matches = re.findall(pattern_split_elements, match.group(1))
-            elements = {key: value for key, value in elements_matches}
-
-            for key, value in elements.items():
-                old_alert_expr[key] = value.replace('|',',')
-
-        else:
-            module.fail_json(msg=r'pattern not found for expr ' + old_alert['expr'])
-
-        old_integrations = old_alert.get('integrations', {})
-        if old_integrations:
-            del old_integrations['Type']
-            del old_integrations['OverrideError']
-            del old_integrations['OverrideInfo']
-            del old_integrations['OverrideWarning']
-            for route_item in old_integrations['Routing']:
-                del route_item['Params']
-
-        old_data = {
-            'name': old_alert['alert'],
-            'description': old_alert['annotations']['description'],
-            'operator': old_alert['operator'],
-            'warning_value': old_alert['warningValue'],
-            'critical_value': old_alert['criticalValue'],
-            'duration': old_alert['for'],
-            'content': old_alert_expr['message'] if 'message' in old_alert_expr else '',
-            'level': old_alert_expr['level'] if 'level' in old_alert_expr else '',
-            'type': old_alert_expr['type'] if 'type' in old_alert_expr else '',
-            'source': old_alert_expr['source'] if 'source' in old_alert_expr else '',
-            'present': True,
-            'integrations': old_alert['integrations']
-        }
-    else:
-        old_data = {'present': False}
-
-    old_data_normalized = normalize_numbers(old_data)
-
-
-    # create the new alert
-    if module.params['present']:
-        new_data = {
-            'name': module.params['name'],
-            'description': module.params['description'],
-            'operator': module.params['operator'],
-            'warning_value': module.params['warning_value'],
-            'critical_value': module.params['critical_value'],
-            'duration': module.params['duration'],
-            'content': module.params['content'],
-            'level': module.params['level'],
-            'type': module.params['type'],
-            'source': module.params['source'],
-            'present': True,
-            'integrations': {}
-        }
-    else:
-        new_data = {
-            'name': module.params['name'],
-            'present': False,
-        }
-
-    # create routing override list
-    routing = []  # format [{id: 'id33s', severity: 'error'},...]
-    for severity in module.params['routing']:
-        if severity not in {"error", "warning", "info"}:
-            module.fail_json(msg=f'{severity} is not a valid level, accepted: info, warn, error')
-        else:
-            for override in module.params['routing'][severity]:
-                integration_id, error = axonops.find_integration_id_by_name(cluster, override)
-                if integration_id is None:
-                    module.fail_json(msg=f"Integration name {override} not configured in AxonOps integrations.")
-                if error is not None:
-                    module.fail_json(msg=error)
-                    return
-                routing.append({
-                    'ID': integration_id if integration_id else "",
-                    'Severity': severity,
-                })
-    if routing:
-        new_data['integrations']['Routing'] = routing
-    elif 'integrations' in new_data:
-        new_data['integrations']['Routing'] = []
-
-    new_data_normalized = normalize_numbers(new_data)
-
-    changed = dicts_are_different(new_data_normalized, old_data_normalized)
-    result['changed'] = changed
-    result['diff'] = {'before': old_data, 'after': new_data}
+    result['changed'] = plan['changed']
+    if 'diff' in plan:
+        result['diff'] = plan['diff']
 
     # Exit if in check mode or no changes
-    if module.check_mode or not changed:
+    if module.check_mode or not plan['action']:
         module.exit_json(**result)
         return
 
     # Delete the alert rule and exit, if present is False
-    if not module.params['present']:
-        if old_alert:
-            _, error = axonops.do_request(rel_url=alerts_url + '/' + old_alert["id"], method='DELETE')
-            if error is not None:
-                module.fail_json(msg=error)
+    if plan['action'] == 'delete':
+        _, error = axonops.do_request(**log_alert_rule_request(axonops, cluster, plan))
+        if error is not None:
+            module.fail_json(msg=error)
         module.exit_json(**result)
         return
 
-    # create the event string for expr
-    events_string = "events{{{message_str}{level_str}{source_str}{type_str}}}".format(
-        message_str=",message=\"{}\"".format(module.params['content']) if module.params['content'] else '',
-        level_str=",level=\"{}\"".format(module.params['level'].replace(',', '|')) if module.params['level'] else '',
-        source_str=",source=\"{}\"".format(
-            module.params['source'].replace(',', '|')) if module.params['source'] else '',
-        type_str=",type=\"{}\"".format(module.params['type'].replace(',', '|')) if module.params['type'] else ''
-    ).replace('{,', '{')
-
     # Create or update the alert rule
-    payload = {
-        'alert': module.params['name'],
-        'for': module.params['duration'],
-        'operator': module.params['operator'],
-        'warningValue': module.params['warning_value'],
-        'criticalValue': module.params['critical_value'],
-        'annotations': {
-            'description': module.params['description'],
-            'summary': "%s is %s than %s (current value: {{$value}}" % (
-                module.params['name'], module.params['operator'], module.params['warning_value']),
-        },
-        'integrations': new_data['integrations'],
-        'expr': events_string,
-        'id': old_alert["id"] if old_alert else str(uuid.uuid4()),
-    }
-    result['payload'] = payload
-    _, error = axonops.do_request(rel_url=alerts_url, method='POST', json_data=payload)
+    result['payload'] = plan['payload']
+    _, error = axonops.do_request(**log_alert_rule_request(axonops, cluster, plan))
     if error is not None:
         result['error'] = error
         module.fail_json(msg=result)
@@ -379,6 +217,20 @@ def run_module():
     module.exit_json(**result)
 
 
+def module_kwargs() -> dict:
+    module_args = make_module_args(LOG_ALERT_RULE_OPTIONS)
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.log_alert_rules
+
+short_description: Configure all the log alerting rules of a cluster in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure a list of log alerting rules in one task.
+    - The alert rules and the integrations are read once, the existing events expressions are parsed once,
+      then only the rules that are different are sent to AxonOps.
+    - The same as looping over axonops.configuration.log_alert_rule, when a rule name is repeated the last one wins.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the alert rules.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    rules:
+        description:
+            - The log alert rules, each one has the options of axonops.configuration.log_alert_rule.
+        required: true
+        type: list
+        elements: dict
+'''
+
+EXAMPLES = r'''
+- name: Install all the log alert rules of a cluster
+  axonops.configuration.log_alert_rules:
+    org: my_org
+    cluster: my_cluster
+    rules:
+      - name: Node Down
+        warning_value: 1
+        critical_value: 5
+        duration: 5m
+        content: 'is now DOWN'
+        source: /var/log/cassandra/system.log
+      - name: Old rule
+        present: false
+'''
+
+RETURN = r'''
+rules:
+    description: The result of each rule, with its name, if it changed, the action sent and the diff.
+    type: list
+    returned: always
+'''
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_log_alert_rules import \
+    LOG_ALERT_RULE_OPTIONS, check_log_alert_rule, fetch_log_alert_rules_state, log_alert_rule_request, \
+    plan_log_alert_rule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'rules': [],
+    }
+
+    # the last definition of a rule wins, as it would when applying them one by one
+    rules = {}
+    errors = []
+    for rule in module.params['rules']:
+        error = check_log_alert_rule(rule)
+        if error is not None:
+            errors.append(f"{rule['name']}: {error}")
+        rules[rule['name']] = rule
+
+    if errors:
+        module.fail_json(msg='; '.join(errors), **result)
+
+    cluster = module.params['cluster']
+
+    # Get existing alerts and integrations once for all the rules, the expressions are parsed once too
+    existing_alerts, error = fetch_log_alert_rules_state(axonops, cluster,
+                                                         any(rule['routing'] for rule in rules.values()))
+    if error is not None:
+        module.fail_json(msg=error, **result)
+
+    # compare all the rules before changing anything
+    plans = []
+    for name, rule in rules.items():
+        plan, error = plan_log_alert_rule(axonops, rule, cluster, existing_alerts)
+        if error is not None:
+            errors.append(f"{name}: {error}")
+            continue
+        plans.append((name, plan))
+
+        result['rules'].append({
+            'name': name,
+            'changed': plan['changed'],
+            'action': plan['action'],
+            'diff': plan.get('diff'),
+        })
+
+    if errors:
+        module.fail_json(msg='; '.join(errors), **result)
+
+    changed_plans = [(name, plan) for name, plan in plans if plan['action']]
+    result['changed'] = bool(changed_plans)
+    result['diff'] = [{'before_header': name, 'after_header': name, **plan['diff']} for name, plan in changed_plans]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not changed_plans:
+        module.exit_json(**result)
+        return
+
+    # Create, update and delete the alert rules
+    responses = axonops.do_requests([log_alert_rule_request(axonops, cluster, plan) for _, plan in changed_plans])
+    errors = [f"{name}: {error}" for (name, _), (_, error) in zip(changed_plans, responses) if error is not None]
+    if errors:
+        module.fail_json(msg="Failed to apply the log alert rules: " + '; '.join(errors), **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'rules': {'type': 'list', 'elements': 'dict', 'required': True, 'options': LOG_ALERT_RULE_OPTIONS},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.logcollectors
+
+short_description: Configure all the logcollectors of a cluster in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure a list of logcollectors in one task.
+    - The logcollectors are read once and written back once, only when a logcollector is different.
+    - The same as looping over axonops.configuration.logcollector, the file identifies the logcollector
+      and when a file is repeated the last one wins.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the logcollectors.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    logcollectors:
+        description:
+            - The logcollectors, each one has the options of axonops.configuration.logcollector.
+        required: true
+        type: list
+        elements: dict
+'''
+
+EXAMPLES = r'''
+- name: Install all the logcollectors of a cluster
+  axonops.configuration.logcollectors:
+    org: my_org
+    cluster: my_cluster
+    logcollectors:
+      - name: Cassandra system.log
+        filename: /var/log/cassandra/system.log
+        dateFormat: yyyy-MM-dd HH:mm:ss,SSS
+      - name: GC log
+        filename: /var/log/cassandra/gc.log.0.current
+        present: false
+'''
+
+RETURN = r'''
+logcollectors:
+    description: The result of each logcollector, with its file, its name, if it changed and the diff.
+    type: list
+    returned: always
+'''
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_logcollectors import \
+    LOGCOLLECTOR_OPTIONS, index_logcollectors, logcollectors_payload, logcollectors_url, plan_logcollector
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'logcollectors': [],
+    }
+
+    url = logcollectors_url(axonops, module.params['cluster'])
+
+    # Get the logcollectors once for all of them
+    logcollectors_api_output, return_error = axonops.do_request(url)
+    if return_error:
+        module.fail_json(msg=return_error, **result)
+
+    existing_logcollectors = index_logcollectors(logcollectors_api_output)
+
+    # the last definition of a file wins, as it would when applying them one by one
+    logcollectors = {logcollector['filename']: logcollector for logcollector in module.params['logcollectors']}
+
+    plans = []
+    for filename, logcollector in logcollectors.items():
+        plan = plan_logcollector(logcollector, existing_logcollectors.get(filename))
+        plans.append((filename, plan))
+
+        result['logcollectors'].append({
+            'filename': filename,
+            'name': logcollector['name'],
+            'changed': plan['changed'],
+            'diff': plan['diff'],
+        })
+
+    changed_plans = [(filename, plan) for filename, plan in plans if plan['changed']]
+    result['changed'] = bool(changed_plans)
+    result['diff'] = [{'before_header': filename, 'after_header': filename, **plan['diff']}
+                      for filename, plan in changed_plans]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not changed_plans:
+        module.exit_json(**result)
+        return
+
+    # Write all the logcollectors back at once
+    _, return_error = axonops.do_request(
+        rel_url=url,
+        method='PUT',
+        json_data=logcollectors_payload(logcollectors_api_output, changed_plans),
+        form_field="addlogs",
+        idempotent=True,
+    )
+
+    if return_error:
+        module.fail_json(msg=return_error, **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'logcollectors': {'type': 'list', 'elements': 'dict', 'required': True, 'options': LOGCOLLECTOR_OPTIONS},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/python3
+
+DOCUMENTATION = r'''
+---
+module: axonops.configuration.service_checks
+
+short_description: Configure all the service checks of a cluster in AxonOps
+
+version_added: '1.0.0'
+
+description:
+    - Configure the HTTP, TCP and shell checks of a cluster in one task.
+    - The health checks are read once and written back once, only when a check is different.
+    - The same as looping over axonops.configuration.http_check, axonops.configuration.tcp_check and
+      axonops.configuration.shell_check, when a check name is repeated the last one wins.
+
+options:
+    base_url:
+        description:
+            - This represent the base url.
+            - Specify this parameter if you are running on-premise.
+            - Ignore if you are Running AxonOps SaaS.
+        required: false
+        type: str
+    org:
+        description:
+            - This is the organisation name in AxonOps Saas.
+            - It can be read from the environment variable AXONOPS_ORG.
+        required: true
+        type: str
+    cluster:
+        description:
+            - Cluster where to apply the service checks.
+            - It can be read from the environment variable AXONOPS_CLUSTER.
+        required: true
+        type: str
+    auth_token:
+        description:
+            - api-token for authenticate to AxonOps SaaS.
+            - It can be read from the environment variable AXONOPS_TOKEN.
+        required: false
+        type: str
+    api_token:
+        description:
+            - api-token to authenticate with AxonOps Server
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authenticate.
+            - It can be read from the environment variable AXONOPS_USERNAME.
+        required: false
+        type: str
+    password:
+        description:
+            - password for authenticate.
+            - It can be read from the environment variable AXONOPS_PASSWORD.
+        required: false
+        type: str
+    cluster_type:
+        description:
+            - The typo of cluster, cassandra, DSE, etc.
+            - Default is cassandra
+            - It can be read from the environment variable AXONOPS_CLUSTER_TYPE.
+        required: false
+        type: str
+    http_checks:
+        description:
+            - The HTTP checks, each one has the options of axonops.configuration.http_check.
+        required: false
+        type: list
+        elements: dict
+    tcp_checks:
+        description:
+            - The TCP checks, each one has the options of axonops.configuration.tcp_check.
+        required: false
+        type: list
+        elements: dict
+    shell_checks:
+        description:
+            - The shell checks, each one has the options of axonops.configuration.shell_check.
+        required: false
+        type: list
+        elements: dict
+'''
+
+EXAMPLES = r'''
+- name: Install all the service checks of a cluster
+  axonops.configuration.service_checks:
+    org: my_org
+    cluster: my_cluster
+    tcp_checks:
+      - name: cql_client_port
+        interval: 3m
+        timeout: 1m
+        tcp: "{{.comp_listen_address}}:{{.comp_native_transport_port}}"
+    shell_checks:
+      - name: Check schema agreement
+        interval: 5m
+        timeout: 1m
+        script: /var/lib/axonops/scripts/check_schema.sh
+      - name: Old check
+        interval: 5m
+        timeout: 1m
+        script: ''
+        present: false
+'''
+
+RETURN = r'''
+checks:
+    description: The result of each check, with its type, its name, if it changed and the diff.
+    type: list
+    returned: always
+'''
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_service_checks import \
+    HTTP_CHECK_OPTIONS, SHELL_CHECK_OPTIONS, TCP_CHECK_OPTIONS, CHECK_TYPES, healthchecks_payload, \
+    healthchecks_url, index_checks, plan_service_check
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
+
+
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    result = {
+        'changed': False,
+        'checks': [],
+    }
+
+    url = healthchecks_url(axonops, module.params['cluster'])
+
+    # Get the health checks once for the three types of checks
+    saas_settings, return_error = axonops.do_request(url)
+    if return_error:
+        module.fail_json(msg=return_error, **result)
+
+    plans = []
+    for check_type, check_type_settings in CHECK_TYPES.items():
+        existing_checks = index_checks(saas_settings[check_type_settings['key']])
+
+        # the last definition of a check wins, as it would when applying them one by one
+        checks = {check['name']: check for check in module.params[f'{check_type}_checks']}
+        for name, check in checks.items():
+            plan = plan_service_check(check_type, check, existing_checks.get(name))
+            plans.append((check_type, name, plan))
+
+            result['checks'].append({
+                'type': check_type,
+                'name': name,
+                'changed': plan['changed'],
+                'diff': plan['diff'],
+            })
+
+    changed_plans = [(check_type, name, plan) for check_type, name, plan in plans if plan['changed']]
+    result['changed'] = bool(changed_plans)
+    result['diff'] = [{'before_header': f'{check_type} check {name}', 'after_header': f'{check_type} check {name}',
+                       **plan['diff']} for check_type, name, plan in changed_plans]
+
+    # Exit if in check mode or no changes
+    if module.check_mode or not changed_plans:
+        module.exit_json(**result)
+        return
+
+    # Write all the checks back at once
+    _, return_error = axonops.do_request(
+        rel_url=url,
+        method='PUT',
+        json_data=healthchecks_payload(saas_settings, changed_plans),
+        idempotent=True,
+    )
+
+    if return_error:
+        module.fail_json(msg=return_error, **result)
+
+    module.exit_json(**result)
+
+
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'http_checks': {'type': 'list', 'elements': 'dict', 'default': [], 'options': HTTP_CHECK_OPTIONS},
+        'tcp_checks': {'type': 'list', 'elements': 'dict', 'default': [], 'options': TCP_CHECK_OPTIONS},
+        'shell_checks': {'type': 'list', 'elements': 'dict', 'default': [], 'options': SHELL_CHECK_OPTIONS},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -89,121 +89,40 @@ url:
 
 '''
 
-import uuid
-from copy import copy
-
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
-from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, \
-    dicts_are_different
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_service_checks import \
+    SHELL_CHECK_OPTIONS, CHECK_TYPES, healthchecks_payload, healthchecks_url, index_checks, plan_service_check
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
 
 
-def run_module():
-    module_args = make_module_args({
-        'present': {'type': 'bool', 'required': False, 'default': True},
-        'name': {'type': 'str', 'required': True},
-        'interval': {'type': 'str', 'required': True},
-        'timeout': {'type': 'str', 'required': True},
-        'shell': {'type': 'str', 'required': False, 'default': '/bin/bash'},
-        'script': {'type': 'str', 'required': True},
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
+    url = healthchecks_url(axonops, module.params['cluster'])
 
-    healthchecks_url = (f"/api/v1/healthchecks/"
-                        f"{module.params['org']}/{axonops.get_cluster_type()}/{module.params['cluster']}")
-
-    saas_settings, return_error = axonops.do_request(healthchecks_url)
+    saas_settings, return_error = axonops.do_request(url)
     if return_error:
         module.fail_json(msg=return_error, **result)
 
     # all the shell checks for that environment
-    current_checks_in_saas = saas_settings['shellchecks']
-    shell_checks_to_send_to_saas = []
-    existing_check = None
-    if current_checks_in_saas:
-        for check in current_checks_in_saas:
-            if check['name'] == module.params['name']:
-                existing_check = check
-            else:
-                shell_checks_to_send_to_saas.append(check)
-
-    if module.params['present']:
-        new_check = {
-            'id': existing_check['id'] if existing_check else str(uuid.uuid4()),
-            'present': module.params['present'],
-            'interval': module.params['interval'],
-            'name': module.params['name'],
-            'script': module.params['script'],
-            'shell': module.params['shell'],
-            'timeout': module.params['timeout'],
-        }
-    else:
-        new_check = {
-            'present': False
-        }
-
-    if existing_check:
-        existing_check_filtered = {
-            'id': existing_check['id'],
-            'present': True,
-            'interval': existing_check['interval'],
-            'name': existing_check['name'],
-            'script': existing_check['script'],
-            'shell': existing_check['shell'],
-            'timeout': existing_check['timeout'],
-        }
-    else:
-        existing_check_filtered = {
-            'present': False
-        }
-
-    changed = dicts_are_different(existing_check_filtered, new_check)
-    result['changed'] = changed
-    result['diff'] = {'before': existing_check_filtered, 'after': copy(new_check)}
-
-    if module.check_mode or not changed:
-        module.exit_json(**result)
-        return
-
-    new_check['readonly'] = False
-
-    new_check['integrations'] = {
-        'OverrideError': False,
-        'OverrideInfo': False,
-        'OverrideWarning': False,
-        'Routing': None,
-        'Type': ''
-    }
+    existing_checks = index_checks(saas_settings[CHECK_TYPES['shell']['key']])
+    plan = plan_service_check('shell', module.params, existing_checks.get(module.params['name']))
 
-    if new_check['present']:
-        shell_checks_to_send_to_saas.append(new_check)
+    result['changed'] = plan['changed']
+    result['diff'] = plan['diff']
 
-    payload = {
-        'httpchecks': saas_settings['httpchecks'],
-        'tcpchecks': saas_settings['tcpchecks'],
-        'shellchecks': shell_checks_to_send_to_saas,
-    }
+    if module.check_mode or not plan['changed']:
+        module.exit_json(**result)
+        return
 
     _, return_error = axonops.do_request(
-        rel_url=healthchecks_url,
+        rel_url=url,
         method='PUT',
-        json_data=payload,
+        json_data=healthchecks_payload(saas_settings, [('shell', module.params['name'], plan)]),
+        idempotent=True,
     )
 
     if return_error:
@@ -212,6 +131,20 @@ def run_module():
     module.exit_json(**result)
 
 
+def module_kwargs() -> dict:
+    module_args = make_module_args(SHELL_CHECK_OPTIONS)
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
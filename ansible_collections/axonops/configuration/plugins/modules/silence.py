@@ -118,38 +118,17 @@ EXAMPLES = r'''
 import uuid
 
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, \
     dicts_are_different
 
 
-def run_module():
-    module_args = make_module_args({
-        'active': {'type': 'bool', 'default': True},
-        'schedule': {'type': 'bool', 'default': False},
-        'schedule_expr': {'type': 'str', 'default': '0 * * * *'},
-        'duration': {'type': 'str','required': True},
-        'dc': {'type': 'list', 'default': []},
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
     result = {
         'changed': False,
     }
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
     silence_window_url = (f"/api/v1/silenceWindow/"
                           f"{module.params['org']}/{axonops.get_cluster_type()}/{module.params['cluster']}")
 
@@ -229,6 +208,26 @@ def run_module():
     module.exit_json(**result)
 
 
+def module_kwargs() -> dict:
+    module_args = make_module_args({
+        'active': {'type': 'bool', 'default': True},
+        'schedule': {'type': 'bool', 'default': False},
+        'schedule_expr': {'type': 'str', 'default': '0 * * * *'},
+        'duration': {'type': 'str','required': True},
+        'dc': {'type': 'list', 'default': []},
+    })
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
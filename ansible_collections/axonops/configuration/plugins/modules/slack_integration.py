@@ -71,125 +71,62 @@ RETURN = r'''
 TODO
 '''
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps
-from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args, \
-    dicts_are_different
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_integrations import \
+    INTEGRATION_TYPES, integration_request, plan_integration, record_integration
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsModule
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import make_module_args
 
 
-def run_module():
-    module_args = make_module_args({
-        'name': {'type': 'str', 'required': True},
-        'webhook_url': {'type': 'str'},
-        'channel': {'type': 'str', 'required': False, 'default': ''},
-        'present': {'type': 'bool', 'default': True},
-        'axonops_url': {'type': 'str', 'required': False, 'default': ''},
-    })
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=[('present', True, ('webhook_url',))]
-    )
+def reconcile(module: AxonOpsModule, axonops: AxonOps):
+    integration_type = INTEGRATION_TYPES['slack']
+
     result = {
-        "changed": False,
+        'changed': False,
     }
 
-    axonops = AxonOps(module.params['org'], auth_token=module.params['auth_token'], base_url=module.params['base_url'],
-                      username=module.params['username'], password=module.params['password'],
-                      cluster_type=module.params['cluster_type'], api_token=module.params['api_token'],
-                      override_saas=module.params['override_saas'])
-    if axonops.errors:
-        module.fail_json(msg=' '.join(axonops.errors), **result)
-
-    integrations_url = \
-        f"/api/v1/integrations/{module.params['org']}/{axonops.get_cluster_type()}/{module.params['cluster']}"
-
     # Find the existing integration
-    found_definition, error = axonops.find_integration_by_name_and_type(module.params['cluster'], 'slack', module.params['name'])
+    found_definition, error = axonops.find_integration_by_name_and_type(
+        module.params['cluster'], integration_type['type'], module.params['name'])
     if error is not None:
         module.fail_json(msg=error)
         return
 
-    existing_id = found_definition['ID'] if found_definition and 'ID' in found_definition else None
-
-    if existing_id:
-        old_data = {
-            'name': found_definition['Params']['name'],
-            'webhook_url': found_definition['Params']['url'],
-            'channel': found_definition['Params'].get('channel', ''),
-            'axonops_url': found_definition['Params']['axondashUrl'],
-            'present': True,
-        }
-    else:
-        old_data = {'present': False}
-
-    if module.params['present']:
-        new_data = {
-            'name': module.params['name'],
-            'webhook_url': module.params['webhook_url'],
-            'channel': module.params['channel'],
-            'axonops_url': module.params['axonops_url'] if module.params['axonops_url'] != '' else axonops.dash_url(),
-            'present': module.params['present'],
-        }
-    else:
-        new_data = {
-            'name': '',
-            'webhook_url': '',
-            'axonops_url': '',
-            'channel': '',
-            'present': False,
-        }
-
-    # Work out what changes are required and make the diff
-    if not module.params['present'] and not existing_id:
-        changed = False
-    else:
-        changed = dicts_are_different(new_data, old_data)
-    result['changed'] = changed
-    result['diff'] = {'before': old_data, 'after': new_data}
+    plan = plan_integration(axonops, 'slack', module.params, found_definition)
+    result['changed'] = plan['changed']
+    result['diff'] = plan['diff']
 
     # Exit if in check mode or no changes
-    if module.check_mode or not changed:
+    if module.check_mode or not plan['changed']:
         module.exit_json(**result)
         return
 
-    # Delete the existing integration
-    if existing_id and not module.params['present']:
-        res, error = axonops.do_request(
-            rel_url=integrations_url + "/" + existing_id,
-            method='DELETE'
-        )
-        if error is not None:
-            module.fail_json(msg=error)
-            return
-        module.exit_json(**result)
-
-    # Add or update the integration
-    payload = {
-        'type': 'slack',
-        'params': {
-            'name': new_data['name'],
-            'url': new_data['webhook_url'],
-            'channel': new_data['channel'],
-            'axondashUrl': new_data['axonops_url'],
-        }
-    }
-    if existing_id:
-        payload['id'] = existing_id
-
-    _, error = axonops.do_request(
-        rel_url=integrations_url,
-        method='POST',
-        json_data=payload
-    )
+    # Add, update or delete the integration
+    _, error = axonops.do_request(**integration_request(axonops, module.params['cluster'], plan))
     if error is not None:
         module.fail_json(msg=error)
         return
+    record_integration(axonops, module.params['cluster'], plan)
 
     module.exit_json(**result)
 
 
+def module_kwargs() -> dict:
+    integration_type = INTEGRATION_TYPES['slack']
+    module_args = make_module_args(integration_type['options'])
+
+    return dict(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        required_if=integration_type['required_if']
+    )
+
+
+def run_module():
+    module = AxonOpsModule(**module_kwargs())
+    module.run(reconcile)
+
+
 def main():
     run_module()
 
@@ -0,0 +1,150 @@
+import contextlib
+import json
+import os
+import threading
+
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.common.parameters import remove_values
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops import AxonOps, make_axonops
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_module import AxonOpsRunner, ModuleExit
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_stats import RequestStats
+from ansible_collections.axonops.configuration.plugins.module_utils.axonops_utils import base_module_args
+
+# the clients by connection parameters. Ansible runs each task in a new worker process, so a client is reused by
+# the loop items of a task and by the lookups templated in the same process
+_clients = {}
+_clients_lock = threading.Lock()
+
+# the parameters that select the cluster, they don't change the client
+CLUSTER_PARAMS = ['cluster', 'clusters', 'cluster_workers']
+
+
+def in_process_enabled() -> bool:
+    """
+    the modules run in the controller process unless AXONOPS_IN_PROCESS is false
+    """
+    return boolean(os.environ.get('AXONOPS_IN_PROCESS', True), strict=False)
+
+
+def get_client(params: dict) -> AxonOps:
+    """
+    Get the client of the connection parameters, created once. The errors, the statistics and the integrations
+    left by the previous loop item are reset, the connections, the JWT and the response cache are kept.
+    """
+    client_params = {key: params[key] for key in base_module_args() if key not in CLUSTER_PARAMS}
+    key = json.dumps(client_params, sort_keys=True, default=str)
+
+    with _clients_lock:
+        axonops = _clients.get(key)
+        if axonops is None:
+            axonops = make_axonops(params)
+            # a client that failed to login is not kept, the next task tries again
+            if not axonops.errors:
+                _clients[key] = axonops
+            return axonops
+
+    # a login that failed for a previous item must not fail this one, it logs in again if needed
+    axonops.errors = []
+    axonops.request_stats = RequestStats(debug=params['stats_debug'])
+    axonops.integration_registries = {}
+    return axonops
+
+
+@contextlib.contextmanager
+def environment(variables: dict):
+    """
+    set the environment variables of the task while the module runs, like they are set for a module process
+    """
+    saved = {name: os.environ.get(name) for name in variables}
+    os.environ.update({name: str(value) for name, value in variables.items()})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class AxonOpsActionModule(AxonOpsRunner):
+    """
+    The module seen by reconcile when it runs in the controller: exit_json and fail_json return the result
+    instead of exiting the process
+    """
+
+    def __init__(self, params: dict, check_mode: bool, diff: bool):
+        self.params = params
+        self.check_mode = check_mode
+        self._diff = diff
+
+    def get_axonops(self) -> AxonOps:
+        self.axonops = get_client(self.params)
+        return self.axonops
+
+    def exit_json(self, **kwargs):
+        raise ModuleExit(self._add_stats(kwargs))
+
+    def fail_json(self, msg, **kwargs):
+        raise ModuleExit({**self._add_stats(kwargs), 'failed': True, 'msg': msg})
+
+
+class AxonOpsActionBase(ActionBase):
+    """
+    Run a module of the collection in the controller process instead of sending it to the host.
+    The subclass sets `module` to the python module of the module, with its module_kwargs and reconcile.
+    The arguments are validated with the spec of the module and the no_log values are removed from the result,
+    like AnsibleModule does.
+    """
+
+    TRANSFERS_FILES = False
+    _requires_connection = False
+
+    module = None
+
+    # False for the modules that don't apply to a cluster
+    fan_out = True
+
+    def _task_environment(self) -> dict:
+        """
+        the environment variables of the task, merged like ActionBase does for a module
+        """
+        final_environment = {}
+        environments = self._task.environment or []
+        if not isinstance(environments, list):
+            environments = [environments]
+        for task_environment in environments:
+            if task_environment:
+                final_environment.update(self._templar.template(task_environment))
+        return final_environment
+
+    def run(self, tmp=None, task_vars=None):
+        if not in_process_enabled():
+            return self._execute_module(module_args=self._task.args, task_vars=task_vars)
+
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        module_kwargs = self.module.module_kwargs()
+        module_kwargs.pop('supports_check_mode', None)
+        validator = ArgumentSpecValidator(**module_kwargs)
+
+        with environment(self._task_environment()):
+            validation = validator.validate(self._task.args)
+            if validation.error_messages:
+                result.update(failed=True, msg=validation.errors.msg)
+            else:
+                module = AxonOpsActionModule(validation.validated_parameters, self._task.check_mode, self._task.diff)
+                try:
+                    module.run(self.module.reconcile, fan_out=self.fan_out)
+                except ModuleExit as module_exit:
+                    result.update(module_exit.result)
+
+        if validation._warnings:
+            result['warnings'] = [f"Both option {warning['option']} and its alias {warning['alias']} are set."
+                                  for warning in validation._warnings]
+        result['invocation'] = {'module_args': validation.validated_parameters}
+        return remove_values(result, validation._no_log_values)
@@ -3,7 +3,7 @@ import os
 import sys
 from typing import Sequence
 
-from .axonops import AxonOps
+from .axonops import AxonOps, DEFAULT_RETRY_BASE_DELAY, DEFAULT_RETRY_MAX_ATTEMPTS
 from .components.repair import AdaptiveRepair
 
 
@@ -25,7 +25,9 @@ class Application:
                                    username=args.username,
                                    password=args.password,
                                    cluster_type=args.cluster,
-                                   verbose=args.v)
+                                   verbose=args.v,
+                                   retry_max_attempts=args.retry_max_attempts,
+                                   retry_base_delay=args.retry_base_delay)
         return self.axonops
 
     def run(self, argv: Sequence):
@@ -45,6 +47,13 @@ class Application:
         parser.add_argument('--url', type=str, default=os.getenv('AXONOPS_URL'),
                             help='Specify the AxonOps URL if not using the AxonOps Cloud environment')
 
+        parser.add_argument('--retry-max-attempts', type=int,
+                            default=int(os.getenv('AXONOPS_RETRY_MAX_ATTEMPTS', DEFAULT_RETRY_MAX_ATTEMPTS)),
+                            help='Attempts for a request failing with a transient error')
+        parser.add_argument('--retry-base-delay', type=float,
+                            default=float(os.getenv('AXONOPS_RETRY_BASE_DELAY', DEFAULT_RETRY_BASE_DELAY)),
+                            help='Seconds to wait before the first retry, doubled on every attempt')
+
         parser.add_argument("-v", action='count', default=0, help="Verbosity")
 
         commands_subparser = parser.add_subparsers(help="commands")
@@ -83,7 +92,11 @@ class Application:
         # if func() is not present it means that no command was inserted
         if hasattr(parsed_result, 'func'):
             self.run_mandatory_args_check(parsed_result)
-            parsed_result.func(parsed_result)
+            try:
+                parsed_result.func(parsed_result)
+            finally:
+                if self.axonops is not None:
+                    self.axonops.close()
         else:
             parser.print_help()
 
@@ -1,17 +1,93 @@
+import email.utils
 import json
+import random
+import time
 import requests
 import urllib.parse
+from requests.adapters import HTTPAdapter
 from typing import List
 
+# connections kept open per host by the session
+DEFAULT_POOL_SIZE = 4
+
+# the response body is read and decompressed in chunks of this size
+READ_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+RETRY_AFTER_MAX = 60.0
+
+# transient answers, the request can be sent again
+RETRY_STATUSES = (429, 502, 503, 504)
+# transient failures before getting an answer
+RETRY_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError)
+# methods that can always be retried, the others only when the caller says the endpoint is idempotent
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
 
 class HTTPCodeError(Exception):
     pass
 
 
+def parse_retry_after(value: str) -> float | None:
+    """
+    read a Retry-After header, it can be a number of seconds or an HTTP date
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before sending a request again: exponential backoff with full jitter,
+    or what the server asks for with Retry-After
+    """
+
+    def __init__(self, max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS, base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 jitter: bool = True):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.jitter = jitter
+
+    def can_retry(self, method: str, idempotent: bool, attempt: int) -> bool:
+        """
+        check if the request that failed on `attempt` (starting from 1) can be sent again
+        """
+        if attempt >= self.max_attempts:
+            return False
+        return idempotent or method.upper() in SAFE_METHODS
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        """
+        seconds to wait after the failed `attempt`
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, RETRY_AFTER_MAX)
+
+        delay = min(RETRY_MAX_DELAY, self.base_delay * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
 class AxonOps:
 
     def __init__(self, org_name: str, base_url: str = '', username: str = '', password: str = '',
-                 cluster_type: str = 'cassandra', api_token: str = '', verbose=False):
+                 cluster_type: str = 'cassandra', api_token: str = '', verbose=False,
+                 retry_max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS,
+                 retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 pool_size: int = DEFAULT_POOL_SIZE):
         self.org_name = org_name
         self.api_token = api_token
         self.username = username
@@ -20,6 +96,22 @@ class AxonOps:
         self.jwt = ''
         self.verbose = verbose
 
+        # all the requests go through one session so the connections are kept alive and reused,
+        # the adapters don't retry, RetryPolicy does
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'User-agent': 'AxonOps Python Module'
+        })
+
+        # transient errors are retried
+        self.retry_policy = RetryPolicy(retry_max_attempts, retry_base_delay)
+        self.retries = 0
+
         # save the integration output to a var so we can use it multiple times
         self.integrations_output = {}
 
@@ -47,9 +139,15 @@ class AxonOps:
     def dash_url(self):
         return self.base_url
 
+    def close(self):
+        """
+        close the connections of the session
+        """
+        self.session.close()
+
     def get_jwt(self) -> str:
         """
-        Get the JWT from the login endpoint
+        Get the JWT from the login endpoint, the login is done once and the token is kept for the next requests
         """
         # if you have it already, use it
         if self.jwt:
@@ -60,19 +158,38 @@ class AxonOps:
                 "password": self.password
             }
 
-            result, return_error = self.do_request("/api/login", json_data=json_data, method='POST')
-
-            if return_error:
-                self.errors.append(return_error)
+            result = self.do_request("/api/login", json_data=json_data, method='POST', auth=False)
+            if not result or 'token' not in result:
+                self.errors.append(f"{self.dash_url()}/api/login returned an invalid result {result}")
+                return ''
             self.jwt = result['token']
             return self.jwt
 
+    def refresh_jwt(self) -> str:
+        """
+        Drop the JWT, it is expired or revoked, and login again
+        """
+        self.jwt = ''
+        return self.get_jwt()
+
+    def auth_headers(self) -> dict:
+        """
+        the Authorization header for the current credential
+        """
+        # If we have a token, use it, otherwise the JWT of the login
+        bearer = self.api_token or self.jwt
+        if not bearer:
+            return {}
+        return {'Authorization': f'Bearer {bearer}'}
+
     def do_request(self, url: str,
                    method: str = "GET",
                    json_data: any = None,
                    data: any = None,
                    form_field: str = "",
-                   ok_codes: List[int] = [200, 201, 204]
+                   ok_codes: List[int] = [200, 201, 204],
+                   idempotent: bool = False,
+                   auth: bool = True
                    ) -> dict:
         """
         Do HTTP(S) requests for the other methods.
@@ -80,28 +197,15 @@ class AxonOps:
         Parameters:
             url (str): The relative URL after the base and the org name.
             method (str): HTTP method to use for the request (GET, POST, PUT, DELETE, etc.)
+            idempotent (bool): The request can be sent again after a transient error, always true for GET.
+            auth (bool): Send the credentials, false for the login.
         """
         full_url = f'{self.dash_url()}{url}'
 
-        # Select the bearer if it is necessary
-        bearer = ''
-
-        # If we have user and password, use them
-        if self.username and self.password:
-            bearer = self.do_login()
-
-        # If we have a token, use it
-        if self.api_token:
-            bearer = self.api_token
-
         if data is None and json_data is not None:
             data = json.dumps(json_data).encode('utf-8')
 
-        headers = {
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {bearer}',
-            'User-agent': 'AxonOps Python Module'
-        }
+        headers = {}
 
         if form_field != "":
             headers['Content-type'] = 'application/x-www-form-urlencoded'
@@ -114,19 +218,77 @@ class AxonOps:
             print(f"{method} {full_url} {headers}")
 
         try:
-            response = requests.request(method, full_url, headers=headers, data=data)
-            if response.status_code == 204:
-                if self.verbose:
-                    print(f"204 No Content received from {full_url}")
-                return {}
+            response = self.request_with_retry(method, full_url, headers, data, idempotent, auth)
 
-            if response.status_code not in ok_codes:
-                raise HTTPCodeError(f"Call to {full_url} returned {response.status_code}")
-            return response.json()
+            # the JWT is expired or revoked, login again and send the request once more
+            if response.status_code == 401 and auth and self.jwt and not self.api_token:
+                self.discard(response)
+                if self.verbose:
+                    print(f"401 received from {full_url}, logging in again")
+                if self.refresh_jwt():
+                    response = self.request_with_retry(method, full_url, headers, data, idempotent, auth)
+
+            with response:
+                if response.status_code == 204:
+                    if self.verbose:
+                        print(f"204 No Content received from {full_url}")
+                    return {}
+
+                if response.status_code not in ok_codes:
+                    raise HTTPCodeError(f"Call to {full_url} returned {response.status_code}")
+                return json.loads(self.read_body(response))
         except json.decoder.JSONDecodeError:
             print(f"url: {full_url} header: {headers} return: {response.status_code}")
             raise
 
+    def request_with_retry(self, method: str, full_url: str, headers: dict, data: any,
+                           idempotent: bool, auth: bool = True) -> requests.Response:
+        """
+        Send the request, and send it again after a backoff while it fails with a transient error
+        """
+        attempt = 1
+        while True:
+            try:
+                send_headers = dict(headers, **self.auth_headers()) if auth else headers
+                response = self.session.request(method, full_url, headers=send_headers, data=data, stream=True)
+            except RETRY_ERRORS as e:
+                if not self.retry_policy.can_retry(method, idempotent, attempt):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                reason = str(e)
+            else:
+                if response.status_code not in RETRY_STATUSES \
+                        or not self.retry_policy.can_retry(method, idempotent, attempt):
+                    return response
+                delay = self.retry_policy.delay(attempt, response.headers.get('Retry-After'))
+                reason = f"status {response.status_code}"
+                self.discard(response)
+
+            if self.verbose:
+                print(f"{method} {full_url} failed with {reason}, retrying in {delay:.1f}s")
+            self.retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+    @staticmethod
+    def discard(response: requests.Response):
+        """
+        read and close a response that is not used, so the connection goes back to the pool
+        """
+        with response:
+            for _ in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                pass
+
+    @staticmethod
+    def read_body(response: requests.Response) -> bytearray:
+        """
+        Read the body in chunks, they are decompressed as they arrive so the compressed body is never held in memory
+        """
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+            body += chunk
+        return body
+
     def get_integration_output(self, cluster: str):
         """
         get the integration output from local variable if present, or from API
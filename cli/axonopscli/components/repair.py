@@ -88,4 +88,5 @@ class AdaptiveRepair:
             url=self.full_url,
             method='POST',
             json_data=self.repair_data,
+            idempotent=True,
         )
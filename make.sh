@@ -3,6 +3,8 @@
 export OBJC_DISABLE_INITIALIZE_FORK_SAFETY=YES
 export UNAME=$(uname -s)
 export ANSIBLE_COLLECTIONS_PATH=./
+# the AxonOps state read by a task is reused by the next tasks of the same run
+export AXONOPS_RUN_ID=${AXONOPS_RUN_ID:-"$(date +%s)-$$"}
 
 # Default to use pipenv unless disabled
 if [[ "${PIPENV}" == "true" ]]; then